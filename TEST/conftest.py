@@ -1,7 +1,50 @@
 import os          # для чтения переменных окружения
+import time        # замер полного времени запроса
+import pathlib     # пути к файлам отчётов
+import itertools   # счётчик уникальных тестовых данных
+import uuid        # идентификатор прогона для пространства имён данных
+import warnings    # предупреждения о превышении бюджета задержки
 import pytest      # тестовый фреймворк
 import requests    # HTTP-клиент для API
 import allure      # для генерации отчетов Allure
+import pytest_asyncio  # асинхронные фикстуры
+
+from support.async_http import AsyncHttpSession, InProcessAsyncTransport
+from support.attachments import AttachPolicy, format_response
+from support.budgets import BudgetTracker, LatencyBudgetWarning, budget_mode, load_budgets
+from support.cassette import CassettePlayer, CassetteRecorder, cassette_mode, cassette_path
+from support.client import ClientConfig
+from support.incremental import IncrementalPlugin
+from support.inprocess import InProcessAdapter, NotesStore
+from support.pool import NotePool
+from support.results_archive import allure_backend, install, write_result_file
+from support.seeding import delete_notes, seed_notes
+from support.timing import TimingCollector
+
+LATENCY_BUDGET_KEY = pytest.StashKey[BudgetTracker]()
+TEST_REPORTS_KEY = pytest.StashKey[dict]()
+ATTACH_POLICY = AttachPolicy.from_env()
+
+
+@pytest.hookimpl(trylast=True)  # после allure-pytest: его файловый логгер уже зарегистрирован
+def pytest_configure(config):
+    """ALLURE_BACKEND=archive - результаты в сжатый архив (support/results_archive.py);
+    INCREMENTAL=1 - пропуск тестов с неизменным отпечатком (support/incremental.py).
+    """
+    worker = os.getenv("PYTEST_XDIST_WORKER", "master")
+    # Управляющий процесс xdist тестов не запускает - архив пишут только воркеры
+    xdist_controller = bool(getattr(config.option, "numprocesses", None)) and not hasattr(config, "workerinput")
+    if allure_backend() == "archive" and config.getoption("allure_report_dir", None) and not xdist_controller:
+        install(config, worker)
+    if not os.getenv("INCREMENTAL"):
+        return
+    if getattr(config, "cache", None) is None:
+        warnings.warn("INCREMENTAL=1 требует кеша pytest (cacheprovider), инкрементальный режим выключен")
+        return
+    # При параллельном запуске результаты из кеша в Allure копирует только первый воркер
+    plugin = IncrementalPlugin(config, write_results=worker in ("master", "gw0"))
+    config.pluginmanager.register(plugin, "incremental")
+    config.add_cleanup(plugin.unregister)
 
 
 # Фикстура: базовый URL для всех запросов
@@ -10,72 +53,324 @@ def base_url() -> str:
     return os.getenv("BASE_URL", "http://localhost:3000")
 
 
+# Фикстура: имя xdist-воркера ("master" при последовательном запуске)
+@pytest.fixture(scope="session")
+def worker_name() -> str:
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+# Фикстура: пространство имён тестовых данных воркера (уникально для воркера и прогона)
+@pytest.fixture(scope="session")
+def data_namespace(worker_name) -> str:
+    # С кассетами тела запросов должны совпадать между записью и воспроизведением
+    run_id = "cassette" if cassette_mode() != "off" else uuid.uuid4().hex[:8]
+    return f"{worker_name}-{run_id}"
+
+
+@pytest.fixture(scope="session")
+def unique_title(data_namespace):
+    """Фабрика заголовков, которые не пересекаются между воркерами и прогонами"""
+    counter = itertools.count(1)
+
+    def _make(base: str) -> str:
+        return f"{base} [{data_namespace}-{next(counter)}]"
+    return _make
+
+
+# Фикстура: хранилище in-process заглушки (None, если тесты идут против живого сервера)
+@pytest.fixture(scope="session")
+def notes_store():
+    if os.getenv("API_BACKEND", "live") == "inprocess":
+        return NotesStore()
+    return None
+
+
+# Фикстура: массовое наполнение API (пакетно для in-process, конкурентными POST для живого сервера);
+# созданные заметки удаляются в конце сессии
+@pytest.fixture(scope="session")
+def bulk_seeder(http, base_url, notes_store, unique_title):
+    concurrency = int(os.getenv("SEED_CONCURRENCY", "100"))
+    seeded = []
+
+    def _ensure(count: int) -> int:
+        """Доводит число заметок в API минимум до count; возвращает итоговое число"""
+        if notes_store is not None:
+            current = len(notes_store)
+        else:
+            response = http.get(f"{base_url}/notes", timeout=120)
+            current = len(response.json()) if response.status_code == 200 else 0
+        if current < count:
+            seeded.extend(seed_notes(
+                base_url,
+                count - current,
+                unique_title,
+                store=notes_store,
+                concurrency=concurrency,
+            ))
+        return max(current, count)
+    yield _ensure
+    delete_notes(base_url, seeded, store=notes_store, concurrency=concurrency)
+
+
 # --- Allure helpers ---
+class LazyBodyResponse(requests.Response):
+    """Ответ, тело которого читается из сети при первом обращении к content (json, text)"""
+    started = headers_at = body_read_at = None
+
+    @property
+    def content(self):
+        content = super().content
+        if self.body_read_at is None:
+            self.body_read_at = time.perf_counter()
+        return content
+
+    @property
+    def total_elapsed(self):
+        """Полное время после чтения тела; пока тело не прочитано - время до заголовков"""
+        return (self.body_read_at or self.headers_at) - self.started
+
+
+def _read_eagerly(resp, limit: int) -> bool:
+    """Тело известной длины не больше limit байт читается сразу, крупное и chunked - по требованию"""
+    if "chunked" in resp.headers.get("Transfer-Encoding", "").lower():
+        return False
+    length = resp.headers.get("Content-Length")
+    return not (length and length.isdigit() and int(length) > limit)
+
+
 class HttpSession(requests.Session):
     """Помогает автоматически прикреплять последние ответы в Allure"""
-    def __init__(self):
+    def __init__(self, timeout_for=None, eager_body_bytes=None):
         super().__init__()
         self.last_response = None
-        
-    def request(self, *args, **kwargs):
-        resp = super().request(*args, **kwargs)
+        self.response_hooks = []  # функции, вызываемые для каждого полученного ответа
+        self.timeout_for = timeout_for  # таймаут по (method, url), если он не передан в вызов
+        self.eager_body_bytes = eager_body_bytes  # тела крупнее читаются лениво (None - всё сразу)
+
+    def request(self, method, url, **kwargs):
+        if self.timeout_for is not None and kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout_for(method, url)
+        lazy = self.eager_body_bytes is not None and "stream" not in kwargs
+        if lazy:
+            kwargs["stream"] = True
+        started = time.perf_counter()
+        resp = super().request(method, url, **kwargs)
+        if lazy and not _read_eagerly(resp, self.eager_body_bytes):
+            # Тело остаётся в сети: тест читает его через content/json, вложение - только префикс
+            resp.__class__ = LazyBodyResponse
+            resp.started, resp.headers_at = started, time.perf_counter()
+        else:
+            if lazy:
+                resp.content
+            resp.total_elapsed = time.perf_counter() - started  # включая чтение тела (elapsed - только до заголовков)
         self.last_response = resp
+        for hook in self.response_hooks:
+            hook(resp)
         return resp
 
 
 @pytest.fixture(scope="session", autouse=True)
-def allure_env(base_url):
-    """Создаёт файл environment.properties, чтобы Allure показывал контекст тестов."""
-    import pathlib
-    results_dir = pathlib.Path("allure-results")
-    results_dir.mkdir(parents=True, exist_ok=True)
-    env_path = results_dir / "environment.properties"
-    with env_path.open("w", encoding="utf-8") as f:
-        f.write(f"BASE_URL={base_url}\n")
+def allure_env(request, base_url, worker_name, client_config, timing_collector):
+    """Создаёт файл environment.properties, чтобы Allure показывал контекст тестов.
+
+    Файл пишется в конце сессии: в него входит итог переиспользования
+    соединений http. При параллельном запуске (pytest -n) файл пишет только
+    первый воркер, итог соединений - тоже по нему.
+    """
     yield
+    if worker_name in ("master", "gw0"):
+        stats = timing_collector.connection_stats()
+        properties = {
+            "BASE_URL": base_url,
+            "API_BACKEND": os.getenv("API_BACKEND", "live"),
+            "CASSETTE_MODE": cassette_mode(),
+            "ALLURE_ATTACH": ATTACH_POLICY.level,
+            "ALLURE_BACKEND": allure_backend(),
+            "LATENCY_BUDGET_MODE": budget_mode(),
+            "INCREMENTAL": "on" if os.getenv("INCREMENTAL") else "off",
+            "WORKERS": os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"),
+            **client_config.describe(),
+            "HTTP_REQUESTS": stats["requests"],
+            "HTTP_CONNECTIONS": f"{stats['connections_new']} new, {stats['connections_reused']} reused",
+            "HTTP_REUSE_RATIO": "n/a" if stats["reuse_ratio"] is None else stats["reuse_ratio"],
+            "HTTP_RETRIES_MADE": stats["retries"],
+        }
+        content = "".join(f"{name}={value}\n" for name, value in properties.items())
+        write_result_file(request.config, "environment.properties", content.encode("utf-8"))
+
+
+# Фикстура: сбор фаз времени запросов за прогон (сводка в Allure, JSON и Prometheus в TIMING_OUTPUT)
+@pytest.fixture(scope="session")
+def timing_collector(worker_name):
+    collector = TimingCollector()
+    yield collector
+    if not collector.samples:
+        return
+    allure.attach(
+        collector.to_json(),
+        name="request_timing.json",
+        attachment_type=allure.attachment_type.JSON
+    )
+    output = os.getenv("TIMING_OUTPUT")
+    if output:
+        output_dir = pathlib.Path(output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / f"timing-{worker_name}.json").write_text(collector.to_json(), encoding="utf-8")
+        (output_dir / f"timing-{worker_name}.prom").write_text(collector.to_prometheus(), encoding="utf-8")
+
+
+# Фикстура: настройки HTTP-клиента (пул, keep-alive, таймауты, повторы) из переменных HTTP_*
+@pytest.fixture(scope="session")
+def client_config() -> ClientConfig:
+    return ClientConfig.from_env()
 
 
 # Фикстура: HTTP-сессия (переиспользует соединения) с поддержкой Allure
 @pytest.fixture(scope="session")
-def http():
-    s = HttpSession()
+def http(base_url, notes_store, worker_name, timing_collector, client_config):
+    s = HttpSession(timeout_for=client_config.timeout_for, eager_body_bytes=client_config.eager_body_bytes)
     s.headers.update({"Accept": "application/json"})  # JSON в ответах по умолчанию
+    if not client_config.keep_alive:
+        s.headers["Connection"] = "close"             # новое соединение на каждый запрос
+    for prefix in ("http://", "https://"):
+        s.mount(prefix, client_config.adapter())      # пул, повторы и фазы DNS/connect/TLS/TTFB
+    s.response_hooks.append(timing_collector.observe)
+    adapter = None
+    if notes_store is not None:
+        adapter = InProcessAdapter(notes_store)       # запросы обслуживаются в памяти, без TCP
+    mode = cassette_mode()
+    if mode == "record":
+        adapter = CassetteRecorder(adapter or s.get_adapter(base_url), cassette_path(worker_name))
+    elif mode == "replay":
+        adapter = CassettePlayer(cassette_path(worker_name))  # ответы из кассеты, без сети
+    if adapter is not None:
+        s.mount(base_url, adapter)
     yield s                                          # объект сессии доступен в тестах
     s.close()                                        # корректное закрытие сессии
+    if mode == "replay" and adapter.unused():
+        warnings.warn(f"В кассете осталось {adapter.unused()} невоспроизведённых обменов: запись могла устареть")
+
+
+# Фикстура: пул заранее созданных заметок (общие для чтения, эксклюзивные для изменения)
+@pytest.fixture(scope="session", autouse=True)
+def note_pool(http, base_url, notes_store, unique_title):
+    pool = NotePool(
+        http,
+        base_url,
+        unique_title,
+        store=notes_store,
+        shared_size=int(os.getenv("NOTE_POOL_SHARED", "3")),
+        batch_size=int(os.getenv("NOTE_POOL_BATCH", "10")),
+        through_session=cassette_mode() != "off",  # с кассетами все обмены должны попасть в запись
+        concurrency=int(os.getenv("SEED_CONCURRENCY", "100")),
+    )
+    http.response_hooks.append(pool.observe)  # заметки, созданные тестами, тоже удаляются в конце
+    yield pool
+    http.response_hooks.remove(pool.observe)
+    pool.cleanup()
+
+
+def attach_response(request, resp, extra_sections=(), name="last_response.txt"):
+    """Добавляет в Allure одно вложение: ответ (requests или httpx) и дополнительные секции.
+
+    Размер тела и набор тестов с вложениями ограничиваются политикой ATTACH_POLICY.
+    """
+    reports = request.node.stash.get(TEST_REPORTS_KEY, {})
+    failed = any(report.failed for report in reports.values())
+    if not ATTACH_POLICY.should_attach(request.node.nodeid, failed):
+        return
+    try:
+        sections = [] if resp is None else [format_response(resp, ATTACH_POLICY.max_bytes)]
+        sections.extend(extra_sections)
+        if sections:
+            allure.attach(
+                "\n\n".join(sections),
+                name=name,
+                attachment_type=allure.attachment_type.TEXT
+            )
+    except Exception as e:
+        allure.attach(
+            str(e),
+            name="allure_attach_error.txt",
+            attachment_type=allure.attachment_type.TEXT
+        )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Сохраняет отчёты фаз теста, чтобы фикстуры знали, упал ли тест."""
+    outcome = yield
+    item.stash.setdefault(TEST_REPORTS_KEY, {})[call.when] = outcome.get_result()
 
 
 @pytest.fixture(autouse=True)
 def _attach_last_response(request, http):
-    """После каждого теста добавляет в Allure тело последнего ответа и метаинформацию."""
+    """После каждого теста добавляет в Allure последний ответ и замеры задержек одним вложением."""
+    http.last_response = None  # не прикрепляем ответ, оставшийся от предыдущего теста
     yield
+    tracker = request.node.stash.get(LATENCY_BUDGET_KEY, None)
+    extra = [tracker.report()] if tracker is not None and tracker.observations else []
     resp = getattr(http, "last_response", None)
-    if resp is not None:
-        try:
-            # Request line + URL
-            req_line = f"{resp.request.method} {resp.url}\n"
+    attach_response(request, resp, extra)
+    if resp is not None and resp._content is False:
+        resp.close()  # непрочитанное тело больше не нужно: соединение не должно висеть до сборки мусора
 
-            # Тело ответа (с обрезкой, если слишком длинное)
-            body = resp.text
-            if len(body) > 20000:
-                body = body[:20000] + "\n... [truncated]"
 
-            # Прикрепляем к отчёту
-            allure.attach(
-                req_line + body,
-                name="last_response.txt",
-                attachment_type=allure.attachment_type.TEXT
-            )
+@pytest.fixture(autouse=True)
+def _latency_budget(request, http):
+    """Проверяет задержку каждого запроса теста по бюджету эндпоинта (замеры попадают во вложение Allure)."""
+    if budget_mode() == "off":
+        yield
+        return
+    budgets = load_budgets()
+    default_ms = None
+    # Ближайший маркер (функция -> класс -> модуль) применяется последним и имеет приоритет
+    for marker in reversed(list(request.node.iter_markers("latency_budget"))):
+        budget_ms = marker.args[0] if marker.args else marker.kwargs["ms"]
+        endpoint = marker.args[1] if len(marker.args) > 1 else marker.kwargs.get("endpoint")
+        if endpoint:
+            budgets[endpoint] = budget_ms
+        else:
+            budgets = dict.fromkeys(budgets, budget_ms)
+            default_ms = budget_ms
 
-            # Добавляем статус и заголовки
-            meta = f"Status: {resp.status_code}\nHeaders: {dict(resp.headers)}"
-            allure.attach(
-                meta,
-                name="response_meta.txt",
-                attachment_type=allure.attachment_type.TEXT
-            )
-        except Exception as e:
-            allure.attach(
-                str(e),
-                name="allure_attach_error.txt",
-                attachment_type=allure.attachment_type.TEXT
-            )
\ No newline at end of file
+    tracker = BudgetTracker(budgets, default_ms)
+    request.node.stash[LATENCY_BUDGET_KEY] = tracker
+    http.response_hooks.append(tracker.observe)
+    yield
+    http.response_hooks.remove(tracker.observe)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Проваливает тест (или предупреждает) при превышении бюджета задержки."""
+    outcome = yield
+    tracker = item.stash.get(LATENCY_BUDGET_KEY, None)
+    if tracker is None or outcome.excinfo is not None:
+        return
+    breaches = tracker.breaches()
+    if not breaches:
+        return
+    message = "Превышен бюджет задержки:\n" + "\n".join(
+        f"{breach['endpoint']}: {breach['elapsed_ms']} мс > {breach['budget_ms']:g} мс" for breach in breaches
+    )
+    if budget_mode() == "fail":
+        outcome.force_exception(AssertionError(message))
+    else:
+        warnings.warn(LatencyBudgetWarning(message))
+
+
+# Фикстура: асинхронная HTTP-сессия (пул keep-alive соединений, лимит конкурентности)
+@pytest_asyncio.fixture
+async def async_http(request, notes_store, note_pool):
+    transport = InProcessAsyncTransport(notes_store) if notes_store is not None else None
+    s = AsyncHttpSession(
+        concurrency=int(os.getenv("ASYNC_CONCURRENCY", "50")),
+        max_connections=int(os.getenv("ASYNC_MAX_CONNECTIONS", "100")),
+        transport=transport,
+        headers={"Accept": "application/json"},
+    )
+    s.response_hooks.append(note_pool.observe_async)  # созданные заметки удаляются в конце сессии
+    yield s
+    attach_response(request, s.last_response, name="last_async_response.txt")
+    await s.aclose()
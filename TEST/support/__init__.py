@@ -0,0 +1 @@
+"""Вспомогательные модули тестового окружения Notes API."""
@@ -0,0 +1,85 @@
+"""Асинхронная HTTP-сессия для сценариев с высокой конкурентностью.
+
+AsyncHttpSession - асинхронный аналог HttpSession из conftest.py: хранит
+last_response для вложений Allure, держит пул keep-alive соединений
+(httpx.AsyncClient) и ограничивает число одновременных запросов семафором.
+"""
+import asyncio
+from typing import Optional
+
+import httpx
+
+from support.inprocess import InProcessAdapter, NotesStore
+
+
+class InProcessAsyncTransport(httpx.AsyncBaseTransport):
+    """Транспорт httpx, который обслуживает запросы in-process заглушкой API"""
+
+    def __init__(self, store: Optional[NotesStore] = None):
+        self.adapter = InProcessAdapter(store)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        status, headers, content = self.adapter.handle(
+            request.method, str(request.url), request.headers, body
+        )
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+class AsyncHttpSession:
+    """Асинхронная сессия с пулом соединений и лимитом конкурентности"""
+
+    def __init__(
+        self,
+        concurrency: int = 50,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        timeout: float = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        headers: Optional[dict] = None,
+    ):
+        self.last_response = None
+        self.response_hooks = []  # функции, вызываемые для каждого полученного ответа (как у HttpSession)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+            ),
+            timeout=timeout,
+            transport=transport,
+            headers=headers,
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self._semaphore:
+            resp = await self.client.request(method, url, **kwargs)
+        self.last_response = resp
+        for hook in self.response_hooks:
+            hook(resp)
+        return resp
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def gather(self, *coros):
+        """Выполняет запросы конкурентно (в пределах лимита сессии)"""
+        return await asyncio.gather(*coros)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
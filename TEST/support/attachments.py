@@ -0,0 +1,82 @@
+"""Ограниченные по размеру вложения ответов в Allure.
+
+Уровни (ALLURE_ATTACH):
+    full     - вложение для каждого теста (поведение по умолчанию)
+    sampled  - для упавших тестов и детерминированной выборки прошедших
+               (доля ALLURE_ATTACH_SAMPLE)
+    failures - только для упавших тестов
+    off      - без вложений
+
+Из тела ответа читается не больше ALLURE_ATTACH_MAX_BYTES байт, строка
+запроса, статус, заголовки и тело собираются в одно вложение.
+"""
+import os
+import zlib
+
+ATTACH_LEVELS = ("full", "sampled", "failures", "off")
+
+
+class AttachPolicy:
+    """Решает, нужно ли вложение для теста, и ограничивает его размер"""
+
+    def __init__(self, level: str = "full", sample_rate: float = 0.1, max_bytes: int = 20000):
+        if level not in ATTACH_LEVELS:
+            raise ValueError(f"ALLURE_ATTACH должен быть одним из {ATTACH_LEVELS}, получен {level}")
+        self.level = level
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> "AttachPolicy":
+        return cls(
+            level=os.getenv("ALLURE_ATTACH", "full"),
+            sample_rate=float(os.getenv("ALLURE_ATTACH_SAMPLE", "0.1")),
+            max_bytes=int(os.getenv("ALLURE_ATTACH_MAX_BYTES", "20000")),
+        )
+
+    def should_attach(self, nodeid: str, failed: bool) -> bool:
+        if self.level == "off":
+            return False
+        if self.level == "full" or failed:
+            return True
+        if self.level == "sampled":
+            # Выборка по хешу nodeid: одни и те же тесты между прогонами и воркерами
+            return zlib.crc32(nodeid.encode("utf-8")) % 10000 < self.sample_rate * 10000
+        return False
+
+
+def read_body_prefix(resp, limit: int):
+    """Первые limit байт тела и признак обрезки.
+
+    Если тело ещё не прочитано (stream=True), читается только нужный префикс
+    из сырого потока, без загрузки и декодирования всего ответа.
+    """
+    if getattr(resp, "_content", None) is False and (resp._content_consumed or resp.raw.closed):
+        # Тело уже прочитано потоком (iter_content) или ответ закрыт, а в памяти его нет
+        return b"[body consumed by streaming reader]", False
+    if getattr(resp, "_content_consumed", True) is False:
+        chunks, size = [], 0
+        for chunk in resp.iter_content(chunk_size=min(8192, limit + 1)):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                break
+        body = b"".join(chunks)
+    else:
+        body = resp.content
+    return body[:limit], len(body) > limit
+
+
+def format_response(resp, max_bytes: int) -> str:
+    """Строка запроса, статус, заголовки и префикс тела одним текстом"""
+    body, truncated = read_body_prefix(resp, max_bytes)
+    text = body.decode(resp.encoding or "utf-8", errors="replace")
+    if truncated:
+        text += f"\n... [truncated to {max_bytes} bytes]"
+    headers = "\n".join(f"{name}: {value}" for name, value in resp.headers.items())
+    return (
+        f"{resp.request.method} {resp.url}\n"
+        f"Status: {resp.status_code}\n"
+        f"{headers}\n\n"
+        f"{text}"
+    )
@@ -0,0 +1,226 @@
+"""Нагрузочный прогон Notes API на основе сценариев из test_api.py.
+
+Повторяет формы запросов функциональных тестов (создание, чтение по ID,
+обновление, удаление, список, поиск по заголовку) в заданной пропорции
+в закрытой (фиксированное число клиентов) или открытой (фиксированная
+частота запросов) модели нагрузки. Результат - JSON со статистикой
+по каждому эндпоинту, который можно сравнивать между сборками.
+"""
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from support.metrics import LatencyRecorder
+from support.schema import validate_created_note, validate_note, validate_notes
+
+# Ожидаемые статусы операций; любой другой ответ считается ошибкой
+EXPECTED_STATUS = {
+    "create": (201,),
+    "read": (200,),
+    "update": (200, 204),
+    "delete": (204,),
+    "list": (200,),
+    "search": (200,),
+}
+
+# Проверки тела ответа по модели заметки (BENCH_VALIDATE=1)
+VALIDATED = {
+    "create": validate_created_note,
+    "read": validate_note,
+    "search": validate_note,
+    "list": validate_notes,
+}
+
+DEFAULT_MIX = {"create": 2, "read": 4, "update": 2, "delete": 1, "list": 1, "search": 2}
+
+
+def parse_mix(value: str, allowed=EXPECTED_STATUS, variable: str = "BENCH_MIX") -> dict:
+    """'create=1,read=4' -> {'create': 1, 'read': 4}; allowed - допустимые операции"""
+    mix = {}
+    for part in filter(None, (chunk.strip() for chunk in value.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in allowed:
+            raise ValueError(f"Неизвестная операция в {variable}: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@dataclass
+class BenchConfig:
+    """Параметры нагрузки; читаются из переменных окружения BENCH_*"""
+    mode: str = "closed"          # closed - N клиентов в цикле, open - фиксированная частота
+    duration: float = 10.0        # длительность прогона, секунды
+    concurrency: int = 10         # число клиентов (closed)
+    rate: float = 100.0           # запросов в секунду (open)
+    seed_notes: int = 20          # заметок, создаваемых до замера
+    validate: bool = False        # проверять тела ответов по модели заметки
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+
+    @classmethod
+    def from_env(cls) -> "BenchConfig":
+        config = cls(
+            mode=os.getenv("BENCH_MODE", cls.mode),
+            duration=float(os.getenv("BENCH_DURATION", cls.duration)),
+            concurrency=int(os.getenv("BENCH_CONCURRENCY", cls.concurrency)),
+            rate=float(os.getenv("BENCH_RATE", cls.rate)),
+            seed_notes=int(os.getenv("BENCH_SEED_NOTES", cls.seed_notes)),
+            validate=os.getenv("BENCH_VALIDATE", "") not in ("", "0"),
+        )
+        if os.getenv("BENCH_MIX"):
+            config.mix = parse_mix(os.environ["BENCH_MIX"])
+        if config.mode not in ("closed", "open"):
+            raise ValueError(f"BENCH_MODE должен быть closed или open, получен {config.mode}")
+        return config
+
+
+class Workload:
+    """Операции нагрузки поверх AsyncHttpSession"""
+
+    def __init__(self, session, base_url: str, make_title: Callable[[str], str], validate: bool = False):
+        self.session = session
+        self.validate = validate
+        self.base_url = base_url
+        self.make_title = make_title
+        self.notes = []       # (id, title) заметок для чтения, обновления и поиска; не удаляются
+        self.disposable = []  # ID заметок, созданных во время замера; их забирает delete
+        self.recorder = LatencyRecorder()
+
+    async def seed(self, count: int):
+        for _ in range(count):
+            title = self.make_title("Тестовая заметка для получения")
+            response = await self._post(title, started=None, record=False)
+            if response is not None and response.status_code == 201:
+                self.notes.append((response.json()["id"], title))
+
+    async def run(self, operation: str, started: Optional[float] = None):
+        """Выполняет операцию; started - плановое время старта для открытой модели"""
+        await getattr(self, operation)(started=started)
+
+    async def _call(self, endpoint: str, operation: str, method: str, url: str,
+                    started: Optional[float], record: bool = True, **kwargs):
+        start = started if started is not None else time.perf_counter()
+        try:
+            response = await self.session.request(method, url, **kwargs)
+        except Exception:
+            if record:
+                self.recorder.record(endpoint, time.perf_counter() - start, ok=False)
+            return None
+        if record:
+            ok = response.status_code in EXPECTED_STATUS[operation]
+            if ok and self.validate and operation in VALIDATED:
+                # Нарушение модели данных считается ошибкой запроса
+                ok = not VALIDATED[operation](response.json())
+            self.recorder.record(endpoint, time.perf_counter() - start, ok=ok)
+        return response
+
+    async def _post(self, title: str, started, record=True):
+        payload = {"title": title, "content": "Содержимое тестовой заметки"}
+        return await self._call("POST /note", "create", "POST", f"{self.base_url}/note",
+                                started, record, json=payload)
+
+    def _pick(self):
+        return random.choice(self.notes) if self.notes else (999999, "ТАКОГО ТАЙТЛА ТОЧНО НЕТ 12345")
+
+    async def create(self, started=None):
+        response = await self._post(self.make_title("Моя первая заметка"), started)
+        if response is not None and response.status_code == 201:
+            self.disposable.append(response.json()["id"])
+
+    async def read(self, started=None):
+        note_id, _ = self._pick()
+        await self._call("GET /note/:id", "read", "GET", f"{self.base_url}/note/{note_id}", started)
+
+    async def update(self, started=None):
+        # Заголовок не меняем, чтобы параллельный поиск по нему оставался корректным
+        note_id, title = self._pick()
+        payload = {"title": title, "content": "ОБНОВЛЕННОЕ содержимое"}
+        await self._call("PUT /note/:id", "update", "PUT", f"{self.base_url}/note/{note_id}",
+                         started, json=payload)
+
+    async def delete(self, started=None):
+        if not self.disposable:
+            await self.create(started=started)
+            return
+        note_id = self.disposable.pop()
+        await self._call("DELETE /note/:id", "delete", "DELETE", f"{self.base_url}/note/{note_id}", started)
+
+    async def list(self, started=None):
+        await self._call("GET /notes", "list", "GET", f"{self.base_url}/notes", started)
+
+    async def search(self, started=None):
+        _, title = self._pick()
+        await self._call("GET /note/read/:title", "search", "GET",
+                         f"{self.base_url}/note/read/{title}", started)
+
+
+def _choose(mix: dict) -> str:
+    operations, weights = zip(*mix.items())
+    return random.choices(operations, weights=weights)[0]
+
+
+async def drive_open(workload: Workload, mix: dict, rate: float, started: float, deadline: float):
+    """Открытая модель: операции запускаются с частотой rate с started до deadline.
+
+    Задержка считается от планового времени запроса, поэтому очередь при
+    перегрузке попадает в замер (без coordinated omission).
+    """
+    tasks = []
+    interval = 1 / rate
+    scheduled = started
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(workload.run(_choose(mix), started=scheduled)))
+        scheduled += interval
+    await asyncio.gather(*tasks)
+
+
+async def run_benchmark(session, base_url: str, config: BenchConfig,
+                        make_title: Callable[[str], str]) -> dict:
+    """Запускает нагрузку и возвращает отчёт (dict, готовый к json.dump)"""
+    workload = Workload(session, base_url, make_title, validate=config.validate)
+    await workload.seed(config.seed_notes)
+
+    started = time.perf_counter()
+    deadline = started + config.duration
+
+    if config.mode == "closed":
+        async def client():
+            while time.perf_counter() < deadline:
+                await workload.run(_choose(config.mix))
+        await asyncio.gather(*(client() for _ in range(config.concurrency)))
+    else:
+        await drive_open(workload, config.mix, config.rate, started, deadline)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "config": {
+            "mode": config.mode,
+            "duration": config.duration,
+            "concurrency": config.concurrency,
+            "rate": config.rate,
+            "seed_notes": config.seed_notes,
+            "validate": config.validate,
+            "mix": config.mix,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": workload.recorder.summary(elapsed),
+    }
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float) -> list:
+    """Список регрессий p95 относительно базового отчёта (tolerance - доля, 0.2 = 20%)"""
+    regressions = []
+    for endpoint, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before or before.get("p95_ms") is None or stats.get("p95_ms") is None:
+            continue
+        if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{endpoint}: p95 {before['p95_ms']} мс -> {stats['p95_ms']} мс"
+            )
+    return regressions
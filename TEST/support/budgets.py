@@ -0,0 +1,84 @@
+"""Бюджеты задержек по эндпоинтам.
+
+Бюджет задаётся таблицей DEFAULT_BUDGETS_MS, переменной окружения
+LATENCY_BUDGETS ("GET /note/:id=200,GET /notes=800") или маркером теста:
+
+    @pytest.mark.latency_budget(200)                    # для всех запросов теста
+    @pytest.mark.latency_budget(200, "GET /note/:id")   # для одного эндпоинта
+
+Задержка берётся из resp.elapsed каждого запроса через HttpSession.
+"""
+import os
+from typing import Optional
+
+from support.metrics import endpoint_template
+
+DEFAULT_BUDGETS_MS = {
+    "GET /notes": 1000,
+    "GET /note/:id": 300,
+    "GET /note/read/:title": 500,
+    "POST /note": 500,
+    "PUT /note/:id": 500,
+    "DELETE /note/:id": 500,
+}
+
+# Реакция на превышение: fail - тест падает, warn - предупреждение, off - не проверять
+BUDGET_MODES = ("fail", "warn", "off")
+
+
+class LatencyBudgetWarning(UserWarning):
+    """Превышение бюджета задержки в режиме warn"""
+
+
+def load_budgets() -> dict:
+    """Таблица бюджетов с учётом переопределений из LATENCY_BUDGETS"""
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for part in filter(None, (chunk.strip() for chunk in os.getenv("LATENCY_BUDGETS", "").split(","))):
+        endpoint, _, value = part.rpartition("=")
+        budgets[endpoint.strip()] = float(value)
+    return budgets
+
+
+def budget_mode() -> str:
+    mode = os.getenv("LATENCY_BUDGET_MODE", "warn")
+    if mode not in BUDGET_MODES:
+        raise ValueError(f"LATENCY_BUDGET_MODE должен быть одним из {BUDGET_MODES}, получен {mode}")
+    return mode
+
+
+class BudgetTracker:
+    """Сравнивает задержку каждого ответа с бюджетом его эндпоинта"""
+
+    def __init__(self, budgets: dict, default_ms: Optional[float] = None):
+        self.budgets = budgets
+        self.default_ms = default_ms   # бюджет из маркера без эндпоинта
+        self.observations = []
+
+    def budget_for(self, endpoint: str) -> Optional[float]:
+        if endpoint in self.budgets:
+            return self.budgets[endpoint]
+        return self.default_ms
+
+    def observe(self, resp):
+        """Хук HttpSession: вызывается для каждого полученного ответа"""
+        endpoint = endpoint_template(resp.request.method, resp.url)
+        elapsed_ms = round(resp.elapsed.total_seconds() * 1000, 3)
+        budget_ms = self.budget_for(endpoint)
+        self.observations.append({
+            "endpoint": endpoint,
+            "elapsed_ms": elapsed_ms,
+            "budget_ms": budget_ms,
+            "breached": budget_ms is not None and elapsed_ms > budget_ms,
+        })
+
+    def breaches(self) -> list:
+        return [item for item in self.observations if item["breached"]]
+
+    def report(self) -> str:
+        """Таблица для вложения в Allure"""
+        lines = [f"{'Эндпоинт':<24} {'Время, мс':>10} {'Бюджет, мс':>11}  Статус"]
+        for item in self.observations:
+            budget = "-" if item["budget_ms"] is None else f"{item['budget_ms']:g}"
+            status = "ПРЕВЫШЕН" if item["breached"] else "ok"
+            lines.append(f"{item['endpoint']:<24} {item['elapsed_ms']:>10} {budget:>11}  {status}")
+        return "\n".join(lines)
@@ -0,0 +1,166 @@
+"""Запись и воспроизведение HTTP-обменов (кассеты) для HttpSession.
+
+CASSETTE_MODE=record - запросы уходят в API как обычно, пары запрос/ответ
+пишутся в кассету; CASSETTE_MODE=replay - ответы отдаются из кассеты без
+сети. Кассета - gzip-файл JSON Lines, одна строка на обмен:
+
+    {"key": "...", "method": "POST", "path": "/note", "request_body": "...",
+     "status": 201, "headers": {...}, "body": "..."}
+
+Такой файл можно собрать и из трафика продакшена: для воспроизведения
+достаточно полей method, path, request_body, status, headers и body.
+
+Запрос ищется по ключу (метод, путь с query, хеш тела); одинаковые запросы
+воспроизводятся в порядке записи. Запрос, которого нет в кассете, - признак
+устаревшей записи: поднимается CassetteMismatchError.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+from requests.adapters import BaseAdapter
+from requests.exceptions import RequestException
+
+from support.inprocess import build_response
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# Заголовки, которые не имеют смысла при воспроизведении (тело хранится уже раскодированным)
+_SKIP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length"}
+
+
+class CassetteMismatchError(RequestException):
+    """Запроса нет в кассете: запись устарела и её нужно перезаписать"""
+
+
+def _path(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def _canonical_body(body) -> bytes:
+    """Тело запроса в каноническом виде: JSON с отсортированными ключами"""
+    if not body:
+        return b""
+    raw = body.encode("utf-8") if isinstance(body, str) else bytes(body)
+    try:
+        return json.dumps(json.loads(raw), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except ValueError:
+        return raw
+
+
+def request_key(method: str, path: str, body) -> str:
+    digest = hashlib.sha1(_canonical_body(body)).hexdigest()[:16]
+    return f"{method.upper()} {path} {digest}"
+
+
+def _encode_body(body: bytes) -> dict:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def load_cassette(path) -> list:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class CassetteRecorder(BaseAdapter):
+    """Адаптер-обёртка: отправляет запрос через inner и записывает обмен"""
+
+    def __init__(self, inner: BaseAdapter, path):
+        super().__init__()
+        self.inner = inner
+        self.path = pathlib.Path(path)
+        self.entries = []
+
+    def send(self, request, **kwargs):
+        response = self.inner.send(request, **kwargs)
+        body = response.content  # для записи тело читается целиком
+        path = _path(request.url)
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in _SKIP_HEADERS}
+        self.entries.append({
+            "key": request_key(request.method, path, request.body),
+            "method": request.method,
+            "path": path,
+            "request_body": _canonical_body(request.body).decode("utf-8", errors="replace"),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            **_encode_body(body),
+        })
+        return response
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.save()
+        self.inner.close()
+
+
+class CassettePlayer(BaseAdapter):
+    """Адаптер, который отвечает из кассеты и не обращается к сети"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = pathlib.Path(path)
+        self.queues = defaultdict(deque)
+        for entry in load_cassette(self.path):
+            key = entry.get("key") or request_key(entry["method"], entry["path"], entry.get("request_body"))
+            self.queues[key].append(entry)
+
+    def send(self, request, **kwargs):
+        path = _path(request.url)
+        key = request_key(request.method, path, request.body)
+        queue = self.queues.get(key)
+        if not queue:
+            raise CassetteMismatchError(self._mismatch_message(request.method, path, request.body),
+                                        request=request)
+        entry = queue.popleft()
+        return build_response(self, request, entry["status"], entry.get("headers", {}),
+                              _decode_body(entry), reason=entry.get("reason"))
+
+    def unused(self) -> int:
+        """Число записанных обменов, которые не были воспроизведены"""
+        return sum(len(queue) for queue in self.queues.values())
+
+    def close(self):
+        pass
+
+    def _mismatch_message(self, method: str, path: str, body) -> str:
+        prefix = f"{method.upper()} {path} "
+        same_route = [key for key, queue in self.queues.items() if queue and key.startswith(prefix)]
+        hint = f"; в кассете есть этот маршрут с другим телом ({len(same_route)} вар.)" if same_route else ""
+        return (
+            f"Запрос {method.upper()} {path} не найден в кассете {self.path}{hint}. "
+            f"Тело: {_canonical_body(body)[:200]!r}. Перезапишите кассету: CASSETTE_MODE=record"
+        )
+
+
+def cassette_mode() -> str:
+    mode = os.getenv("CASSETTE_MODE", "off")
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"CASSETTE_MODE должен быть одним из {CASSETTE_MODES}, получен {mode}")
+    return mode
+
+
+def cassette_path(worker_name: str) -> pathlib.Path:
+    """Путь к кассете; {worker} подставляется, чтобы воркеры xdist писали в свои файлы"""
+    template = os.getenv("CASSETTE_PATH", "cassettes/{worker}.jsonl.gz")
+    return pathlib.Path(template.format(worker=worker_name))
@@ -0,0 +1,103 @@
+"""Настройки HTTP-клиента тестов: пул соединений, keep-alive, таймауты и повторы.
+
+Все параметры читаются из переменных окружения HTTP_* (см. README):
+    - размер пула соединений адаптера на хост;
+    - постоянные соединения (keep-alive) и TCP keepalive сокетов;
+    - таймаут подключения и чтения, в том числе по шаблонам эндпоинтов
+      ("GET /notes=60,POST /note=5", как у LATENCY_BUDGETS);
+    - повторы с экспоненциальной задержкой. Повторяются только идемпотентные
+      методы; ошибки подключения (запрос не ушёл) повторяются для любых.
+
+Таймаут из настроек подставляется сессией, только если его не передали в
+вызов явно. Тело ответа длиннее eager_body_bytes (или без Content-Length)
+сессия не читает сразу: оно загружается при обращении теста к content/json,
+а вложение Allure читает из сети только свой префикс.
+"""
+import os
+import socket
+from dataclasses import dataclass, field
+
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+from support.metrics import endpoint_template
+from support.timing import TimingAdapter
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+def _parse_timeouts(value: str) -> dict:
+    timeouts = {}
+    for part in filter(None, (chunk.strip() for chunk in value.split(","))):
+        endpoint, _, seconds = part.rpartition("=")
+        timeouts[endpoint.strip()] = float(seconds)
+    return timeouts
+
+
+@dataclass
+class ClientConfig:
+    """Параметры HTTP-клиента; читаются из переменных окружения HTTP_*"""
+    pool_size: int = 10               # соединений в пуле на хост
+    keep_alive: bool = True           # постоянные соединения (False - Connection: close)
+    tcp_keepalive: float = 0.0        # простой до первой TCP keepalive-пробы, секунды (0 - выключен)
+    connect_timeout: float = 10.0     # таймаут подключения, секунды
+    timeout: float = 10.0             # таймаут чтения по умолчанию, секунды
+    timeouts: dict = field(default_factory=dict)  # таймауты чтения по шаблонам эндпоинтов
+    retries: int = 0                  # повторов на запрос (0 - без повторов)
+    backoff: float = 0.2              # база экспоненциальной задержки между повторами, секунды
+    retry_statuses: tuple = (502, 503, 504)
+    eager_body_bytes: int = 1048576   # тела ответов крупнее читаются по требованию, а не сразу
+
+    @classmethod
+    def from_env(cls) -> "ClientConfig":
+        statuses = os.getenv("HTTP_RETRY_STATUSES")
+        return cls(
+            pool_size=int(os.getenv("HTTP_POOL_SIZE", cls.pool_size)),
+            keep_alive=os.getenv("HTTP_KEEP_ALIVE", "1") not in ("0", "false", "off"),
+            tcp_keepalive=float(os.getenv("HTTP_TCP_KEEPALIVE", cls.tcp_keepalive)),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", cls.connect_timeout)),
+            timeout=float(os.getenv("HTTP_TIMEOUT", cls.timeout)),
+            timeouts=_parse_timeouts(os.getenv("HTTP_TIMEOUTS", "")),
+            retries=int(os.getenv("HTTP_RETRIES", cls.retries)),
+            backoff=float(os.getenv("HTTP_RETRY_BACKOFF", cls.backoff)),
+            retry_statuses=tuple(int(code) for code in statuses.split(",")) if statuses else cls.retry_statuses,
+            eager_body_bytes=int(os.getenv("HTTP_EAGER_BODY_BYTES", cls.eager_body_bytes)),
+        )
+
+    def timeout_for(self, method: str, url: str) -> tuple:
+        """(таймаут подключения, таймаут чтения) для запроса"""
+        return self.connect_timeout, self.timeouts.get(endpoint_template(method, url), self.timeout)
+
+    def retry(self) -> Retry:
+        return Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,  # после последнего повтора тест получает сам ответ, а не исключение
+        )
+
+    def socket_options(self) -> list:
+        options = list(HTTPConnection.default_socket_options)  # TCP_NODELAY
+        if self.tcp_keepalive:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            if hasattr(socket, "TCP_KEEPIDLE"):  # Linux; на других системах - системный интервал
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, max(1, int(self.tcp_keepalive))))
+        return options
+
+    def adapter(self) -> TimingAdapter:
+        """Адаптер с пулом, повторами и параметрами сокетов из настроек"""
+        return TimingAdapter(
+            pool_maxsize=self.pool_size,
+            max_retries=self.retry(),
+            socket_options=self.socket_options(),
+        )
+
+    def describe(self) -> dict:
+        """Краткое описание настроек для environment.properties"""
+        return {
+            "HTTP_POOL_SIZE": self.pool_size,
+            "HTTP_KEEP_ALIVE": "on" if self.keep_alive else "off",
+            "HTTP_TIMEOUT": f"{self.connect_timeout:g}/{self.timeout:g}",
+            "HTTP_RETRIES": self.retries,
+        }
@@ -0,0 +1,281 @@
+"""Инкрементальный режим: пропуск тестов, входные данные которых не менялись.
+
+Для каждого теста считается отпечаток (fingerprint) из:
+    - исходного кода самой тестовой функции (с декораторами и параметрами);
+    - исходного кода всех фикстур, которые она использует (включая autouse);
+    - "каркаса" своего модуля, соседних тестовых модулей, которые он
+      импортирует, и conftest.py на пути к нему - всего, кроме тестов и
+      фикстур (вспомогательные функции, константы, хуки);
+    - содержимого пакета support, pytest.ini и req.txt;
+    - версии сервера (INCREMENTAL_SERVER_VERSION) или хеша его контракта
+      (SERVER/server.js), а также BASE_URL, API_BACKEND, CASSETTE_MODE и
+      переменных LATENCY_BUDGET*, HTTP_* и ALLURE_ATTACH*.
+
+Тест, который в прошлый раз прошёл с тем же отпечатком, снимается с запуска,
+а его сохранённый результат Allure (со вложениями) копируется в текущие
+результаты (каталог или архив, см. results_archive.py) с тегом cached.
+Упавшие в прошлый раз тесты перезапускаются всегда и идут первыми.
+Результаты хранятся в кеше pytest (.pytest_cache), по каталогу на тест.
+"""
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+import shutil
+import uuid
+
+import allure_commons
+import pytest
+from attr import asdict
+
+from support.results_archive import write_result_file
+
+CACHE_DIR = "incremental"
+
+# Переменные окружения, от которых зависят результаты всех тестов
+ENV_INPUTS = ("BASE_URL", "API_BACKEND", "CASSETTE_MODE")
+# ...и семейства переменных: бюджеты задержки, настройки HTTP-клиента, вложения
+ENV_PREFIXES = ("LATENCY_BUDGET", "HTTP_", "ALLURE_ATTACH")
+# Файлы настроек прогона и зависимостей в корне тестов
+CONFIG_FILES = ("pytest.ini", "req.txt")
+
+
+def _sha(*parts: str) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _is_fixture(node) -> bool:
+    return any("fixture" in ast.unparse(decorator) for decorator in getattr(node, "decorator_list", ()))
+
+
+def _is_test(node) -> bool:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return node.name.startswith("test")
+    return False
+
+
+def module_skeleton(path: pathlib.Path) -> str:
+    """Хеш модуля без тестов и фикстур: они учитываются отдельно, в отпечатке теста"""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    parts = []
+    for node in tree.body:
+        if _is_test(node) or _is_fixture(node):
+            continue
+        if isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            members = [member for member in node.body if not _is_test(member) and not _is_fixture(member)]
+            node = ast.ClassDef(node.name, node.bases, node.keywords, members, node.decorator_list)
+        parts.append(ast.dump(node))
+    return _sha(*parts)
+
+
+def local_imports(path: pathlib.Path) -> list:
+    """Модули из каталога path, которые он импортирует (from test_api import ...), с их импортами"""
+    found, pending = [], [path]
+    while pending:
+        current = pending.pop()
+        for node in ast.parse(current.read_text(encoding="utf-8")).body:
+            if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                candidate = path.parent / (name.replace(".", "/") + ".py")
+                if candidate.exists() and candidate != path and candidate not in found:
+                    found.append(candidate)
+                    pending.append(candidate)
+    return sorted(found)
+
+
+def server_contract(rootpath: pathlib.Path) -> str:
+    version = os.getenv("INCREMENTAL_SERVER_VERSION")
+    if version:
+        return version
+    source = rootpath.parent / "SERVER" / "server.js"
+    return _sha(source.read_text(encoding="utf-8")) if source.exists() else ""
+
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return repr(obj)  # встроенные фикстуры pytest без исходника
+
+
+def _attachment_sources(data) -> list:
+    """Имена файлов вложений из результата Allure (включая вложения шагов)"""
+    sources = [attachment["source"] for attachment in data.get("attachments", ())]
+    for step in data.get("steps", ()):
+        sources += _attachment_sources(step)
+    return sources
+
+
+class _ResultCapture:
+    """Плагин allure_commons: запоминает результат Allure и вложения текущего теста"""
+
+    def __init__(self):
+        self.current = None
+        self.results = {}
+        self.attachments = {}
+
+    @allure_commons.hookimpl
+    def report_result(self, result):
+        if self.current is not None:
+            # Тот же формат, что пишет AllureFileLogger
+            self.results[self.current] = asdict(result, filter=lambda _, v: v or v is False)
+
+    @allure_commons.hookimpl
+    def report_attached_data(self, body, file_name):
+        if self.current is not None:
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            self.attachments.setdefault(self.current, {})[file_name] = data
+
+    @allure_commons.hookimpl
+    def report_attached_file(self, source, file_name):
+        if self.current is not None:
+            self.attachments.setdefault(self.current, {})[file_name] = pathlib.Path(source).read_bytes()
+
+
+class IncrementalPlugin:
+    """Снимает с запуска тесты с неизменным отпечатком и восстанавливает их результаты"""
+
+    def __init__(self, config, write_results: bool = True):
+        self.config = config
+        self.cache_root = pathlib.Path(config.cache.mkdir(CACHE_DIR))
+        self.allure_dir = config.getoption("allure_report_dir", None)
+        self.write_results = write_results  # при xdist результаты восстанавливает только один воркер
+        self.fingerprints = {}
+        self.module_inputs = {}
+        self.outcomes = {}
+        self.reused = []
+        self.failed_first = 0
+        self.capture = _ResultCapture()
+        allure_commons.plugin_manager.register(self.capture)
+
+    def unregister(self):
+        allure_commons.plugin_manager.unregister(self.capture)
+
+    # --- Отпечатки ---
+    def _global_inputs(self) -> str:
+        """Входы всех тестов: пакет support, файлы настроек, контракт сервера и переменные окружения"""
+        rootpath = self.config.rootpath
+        files = sorted((rootpath / "support").rglob("*.py"))
+        files += [rootpath / name for name in CONFIG_FILES if (rootpath / name).exists()]
+        parts = []
+        for path in files:
+            # По байтам: req.txt хранится в UTF-16
+            parts.append(path.relative_to(rootpath).as_posix() + ":" + hashlib.sha1(path.read_bytes()).hexdigest())
+        parts.append(server_contract(rootpath))
+        parts += [f"{name}={os.getenv(name, '')}" for name in ENV_INPUTS]
+        parts += [f"{name}={value}" for name, value in sorted(os.environ.items()) if name.startswith(ENV_PREFIXES)]
+        return _sha(*parts)
+
+    def _module_inputs(self, path: pathlib.Path) -> str:
+        """Каркас тестового модуля, импортируемых им соседних модулей и conftest.py на пути к нему"""
+        if path not in self.module_inputs:
+            rootpath = self.config.rootpath
+            files = [path] + local_imports(path)
+            directory = path.parent
+            while directory == rootpath or rootpath in directory.parents:
+                if (directory / "conftest.py").exists():
+                    files.append(directory / "conftest.py")
+                directory = directory.parent
+            self.module_inputs[path] = _sha(*(
+                file.relative_to(rootpath).as_posix() + ":" + module_skeleton(file) for file in files
+            ))
+        return self.module_inputs[path]
+
+    def fingerprint(self, item, global_inputs: str) -> str:
+        parts = [global_inputs, self._module_inputs(item.path), item.nodeid, _source(getattr(item, "function", None))]
+        for name in sorted(item.fixturenames):
+            for fixturedef in item._fixtureinfo.name2fixturedefs.get(name, ()):
+                parts.append(f"{name}:{_source(fixturedef.func)}")
+        return _sha(*parts)
+
+    # --- Кеш ---
+    def _entry_dir(self, nodeid: str) -> pathlib.Path:
+        return self.cache_root / hashlib.sha1(nodeid.encode("utf-8")).hexdigest()[:16]
+
+    def _load(self, nodeid: str):
+        try:
+            return json.loads((self._entry_dir(nodeid) / "entry.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, nodeid: str, outcome: str):
+        entry_dir = self._entry_dir(nodeid)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        entry_dir.mkdir(parents=True)
+        result = self.capture.results.get(nodeid) if outcome == "passed" else None
+        if result is not None:
+            attachments = self.capture.attachments.get(nodeid, {})
+            for source in _attachment_sources(result):
+                if source in attachments:
+                    (entry_dir / source).write_bytes(attachments[source])
+        entry = {"nodeid": nodeid, "fingerprint": self.fingerprints[nodeid], "outcome": outcome, "result": result}
+        (entry_dir / "entry.json").write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+
+    def _restore(self, nodeid: str, entry: dict):
+        result = entry.get("result")
+        if not result or not self.allure_dir or not self.write_results:
+            return
+        for source in _attachment_sources(result):
+            cached = self._entry_dir(nodeid) / source
+            if cached.exists():
+                write_result_file(self.config, source, cached.read_bytes())
+        result = dict(result, labels=list(result.get("labels", ())) + [{"name": "tag", "value": "cached"}])
+        write_result_file(self.config, f"{uuid.uuid4()}-result.json",
+                          json.dumps(result, ensure_ascii=False).encode("utf-8"))
+
+    # --- Хуки pytest ---
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        global_inputs = self._global_inputs()
+        failed, fresh, rest = [], [], []
+        for item in items:
+            self.fingerprints[item.nodeid] = self.fingerprint(item, global_inputs)
+            entry = self._load(item.nodeid)
+            if entry is None:
+                rest.append(item)
+            elif entry["outcome"] == "failed":
+                failed.append(item)
+            elif entry["outcome"] == "passed" and entry["fingerprint"] == self.fingerprints[item.nodeid]:
+                fresh.append(item)
+                self._restore(item.nodeid, entry)
+            else:
+                rest.append(item)
+        if fresh:
+            config.hook.pytest_deselected(items=fresh)
+        self.reused = [item.nodeid for item in fresh]
+        self.failed_first = len(failed)
+        items[:] = failed + rest
+
+    def pytest_report_collectionfinish(self, config, start_path, items):
+        return (f"incremental: {len(self.reused)} тестов взято из кеша, "
+                f"{len(items)} запускается (из них ранее упавших: {self.failed_first})")
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.capture.current = nodeid
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed:
+            self.outcomes[report.nodeid] = "failed"
+        elif report.skipped and self.outcomes.get(report.nodeid) != "failed":
+            self.outcomes[report.nodeid] = "skipped"
+        elif report.when == "call" and report.nodeid not in self.outcomes:
+            self.outcomes[report.nodeid] = "passed"
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.capture.current = None
+        if exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED and self.reused:
+            session.exitstatus = pytest.ExitCode.OK  # все тесты взяты из кеша - это успешный прогон
+        for nodeid, outcome in self.outcomes.items():
+            if nodeid in self.fingerprints:
+                self._save(nodeid, outcome)
@@ -0,0 +1,272 @@
+"""In-process заглушка Notes API.
+
+Повторяет поведение SERVER/server.js (маршруты, статусы 201/204/404/409,
+формат ответов) и подключается к requests.Session как транспортный адаптер:
+
+    session.mount(base_url, InProcessAdapter(NotesStore()))
+
+После этого все запросы к base_url обрабатываются в памяти процесса,
+без Node-сервера и без TCP.
+"""
+import io
+import json
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3 import HTTPResponse
+
+# Лимит body-parser.json() по умолчанию (100kb)
+BODY_LIMIT = 100 * 1024
+
+_INT_PREFIX = re.compile(r"^\s*([+-]?\d+)")
+
+_REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    409: "Conflict",
+    413: "Payload Too Large",
+}
+
+
+def _parse_int(value: str) -> Optional[int]:
+    """Аналог parseInt() из JS: берёт целое из начала строки, иначе None (NaN)"""
+    match = _INT_PREFIX.match(value)
+    return int(match.group(1)) if match else None
+
+
+def _js_truthy(value) -> bool:
+    """Истинность значения по правилам JS (пустые списки и словари истинны)"""
+    if value is None or value is False:
+        return False
+    if isinstance(value, (int, float, str)):
+        return bool(value)
+    return True
+
+
+def _now() -> str:
+    """Текущее время в формате JSON-сериализации Date: 2024-01-01T00:00:00.000Z"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _charset(content_type: str) -> str:
+    """Параметр charset из Content-Type (по умолчанию utf-8)"""
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip('"').lower()
+    return "utf-8"
+
+
+def build_response(adapter, request, status: int, headers: dict, body: bytes,
+                   reason: Optional[str] = None) -> Response:
+    """Собирает requests.Response из готовых статуса, заголовков и тела"""
+    headers = dict(headers, **{"Content-Length": str(len(body))})
+    reason = _REASONS.get(status, "") if reason is None else reason
+    response = Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.raw = HTTPResponse(
+        body=io.BytesIO(body),
+        headers=headers,
+        status=status,
+        reason=reason,
+        preload_content=False,
+        decode_content=False,
+    )
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    return response
+
+
+class NotesStore:
+    """Хранилище заметок в памяти, аналог массива notes в server.js"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._notes = []
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def all(self) -> list:
+        with self._lock:
+            return [dict(note) for note in self._notes]
+
+    def get(self, note_id: Optional[int]) -> Optional[dict]:
+        with self._lock:
+            for note in self._notes:
+                if note["id"] == note_id:
+                    return dict(note)
+        return None
+
+    def find_by_title(self, title: str) -> Optional[dict]:
+        with self._lock:
+            for note in self._notes:
+                if note["title"] == title:
+                    return dict(note)
+        return None
+
+    def create(self, title, content) -> dict:
+        with self._lock:
+            now = _now()
+            note = {
+                "id": self._next_id,
+                "title": title,
+                "content": content,
+                "created": now,
+                "changed": now,
+            }
+            self._next_id += 1
+            self._notes.append(note)
+            return dict(note)
+
+    def create_many(self, items) -> list:
+        """Пакетное создание заметок из пар (title, content); возвращает их ID"""
+        with self._lock:
+            now = _now()
+            ids = []
+            for title, content in items:
+                self._notes.append({
+                    "id": self._next_id,
+                    "title": title,
+                    "content": content,
+                    "created": now,
+                    "changed": now,
+                })
+                ids.append(self._next_id)
+                self._next_id += 1
+            return ids
+
+    def update(self, note_id: Optional[int], title=None, content=None) -> bool:
+        with self._lock:
+            for note in self._notes:
+                if note["id"] == note_id:
+                    if _js_truthy(title):
+                        note["title"] = title
+                    if _js_truthy(content):
+                        note["content"] = content
+                    note["changed"] = _now()
+                    return True
+        return False
+
+    def delete(self, note_id: Optional[int]) -> bool:
+        with self._lock:
+            for index, note in enumerate(self._notes):
+                if note["id"] == note_id:
+                    del self._notes[index]
+                    return True
+        return False
+
+
+class InProcessAdapter(BaseAdapter):
+    """Транспортный адаптер requests, который обслуживает запросы из NotesStore"""
+
+    def __init__(self, store: Optional[NotesStore] = None):
+        super().__init__()
+        self.store = store if store is not None else NotesStore()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        status, headers, body = self.handle(request.method, request.url, request.headers, request.body)
+        return build_response(self, request, status, headers, body)
+
+    def close(self):
+        pass
+
+    # --- Маршрутизация ---
+    def handle(self, method: str, url: str, headers, body):
+        """Обрабатывает запрос и возвращает (status, headers, body_bytes)"""
+        method = method.upper()
+        path = urlsplit(url).path or "/"
+        # Express по умолчанию не различает регистр и завершающий слэш
+        segments = path.rstrip("/").split("/")[1:]
+        route = [s.lower() for s in segments]
+
+        # body-parser отрабатывает раньше маршрутов, поэтому 400/413 приоритетнее
+        payload = self._parse_body(headers, body)
+        if isinstance(payload, tuple):
+            return payload
+
+        if method == "GET" and route == ["notes"]:
+            notes = self.store.all()
+            if not notes:
+                return self._json(404, {"message": "No notes found"})
+            return self._json(200, notes)
+
+        if method == "GET" and len(route) == 3 and route[:2] == ["note", "read"]:
+            note = self.store.find_by_title(unquote(segments[2]))
+            if note is None:
+                return self._json(404, {"message": "Note not found"})
+            return self._json(200, note)
+
+        if method == "POST" and route == ["note"]:
+            title, content = payload.get("title"), payload.get("content")
+            if not _js_truthy(title) or not _js_truthy(content):
+                return self._json(409, {"message": "Title and content are required"})
+            return self._json(201, self.store.create(title, content))
+
+        if len(route) == 2 and route[0] == "note" and method in ("GET", "PUT", "DELETE"):
+            note_id = _parse_int(unquote(segments[1]))
+            if method == "GET":
+                note = self.store.get(note_id)
+                if note is None:
+                    return self._json(404, {"message": "Note not found"})
+                return self._json(200, note)
+            if method == "DELETE":
+                if not self.store.delete(note_id):
+                    return self._json(409, {"message": "Note not found"})
+                return 204, {}, b""
+            if not self.store.update(note_id, payload.get("title"), payload.get("content")):
+                return self._json(409, {"message": "Note not found"})
+            return 204, {}, b""
+
+        return self._html(404, f"Cannot {method} {path}")
+
+    # --- Вспомогательные методы ---
+    def _parse_body(self, headers, body):
+        """Разбор тела как в body-parser.json(): dict при успехе, иначе готовый ответ"""
+        content_type = (headers or {}).get("Content-Type", "")
+        if "application/json" not in content_type.lower() or not body:
+            return {}
+        raw = body.encode("utf-8") if isinstance(body, str) else bytes(body)
+        if len(raw) > BODY_LIMIT:
+            return self._html(413, "PayloadTooLargeError: request entity too large")
+        # body-parser принимает только кодировки utf-*; тело не в заявленной кодировке - ошибка разбора
+        charset = _charset(content_type)
+        try:
+            if not charset.startswith("utf-"):
+                raise LookupError(charset)
+            text = raw.decode(charset).lstrip()
+        except (UnicodeDecodeError, LookupError):
+            return self._html(400, "SyntaxError: Unexpected token")
+        # strict-режим body-parser: принимаются только объекты и массивы
+        if text and text[0] not in "{[":
+            return self._html(400, "SyntaxError: Unexpected token")
+        try:
+            payload = json.loads(text) if text else {}
+        except ValueError:
+            return self._html(400, "SyntaxError: Unexpected token")
+        return payload if isinstance(payload, dict) else {}
+
+    @staticmethod
+    def _json(status: int, data):
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return status, {"Content-Type": "application/json; charset=utf-8"}, body
+
+    @staticmethod
+    def _html(status: int, message: str):
+        body = f"<pre>{message}</pre>".encode("utf-8")
+        return status, {"Content-Type": "text/html; charset=utf-8"}, body
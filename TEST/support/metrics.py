@@ -0,0 +1,70 @@
+"""Общие утилиты для измерений: шаблоны эндпоинтов и статистика задержек."""
+import math
+import re
+from collections import defaultdict
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Шаблоны маршрутов server.js (порядок важен: /note/read/:title раньше /note/:id)
+_ROUTES = [
+    (re.compile(r"^/notes/?$", re.IGNORECASE), "/notes"),
+    (re.compile(r"^/note/read/[^/]+/?$", re.IGNORECASE), "/note/read/:title"),
+    (re.compile(r"^/note/[^/]+/?$", re.IGNORECASE), "/note/:id"),
+    (re.compile(r"^/note/?$", re.IGNORECASE), "/note"),
+]
+
+
+def endpoint_template(method: str, url: str) -> str:
+    """Приводит запрос к шаблону эндпоинта: GET /note/123 -> 'GET /note/:id'"""
+    path = urlsplit(str(url)).path or "/"
+    for pattern, template in _ROUTES:
+        if pattern.match(path):
+            return f"{method.upper()} {template}"
+    return f"{method.upper()} {path}"
+
+
+def percentile(sorted_values: list, pct: float) -> Optional[float]:
+    """Перцентиль по методу nearest-rank для заранее отсортированного списка"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyRecorder:
+    """Накапливает задержки и ошибки по шаблонам эндпоинтов"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self, elapsed: Optional[float] = None) -> dict:
+        """Сводка по каждому эндпоинту и итог 'total'; задержки в миллисекундах"""
+        result = {}
+        for endpoint in sorted(self.latencies):
+            result[endpoint] = self._describe(self.latencies[endpoint], self.errors[endpoint], elapsed)
+        everything = [value for values in self.latencies.values() for value in values]
+        result["total"] = self._describe(everything, sum(self.errors.values()), elapsed)
+        return result
+
+    @staticmethod
+    def _describe(values: list, errors: int, elapsed: Optional[float]) -> dict:
+        ordered = sorted(values)
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "count": len(ordered),
+            "errors": errors,
+            "rps": round(len(ordered) / elapsed, 2) if elapsed else None,
+            "p50_ms": ms(percentile(ordered, 50)),
+            "p95_ms": ms(percentile(ordered, 95)),
+            "p99_ms": ms(percentile(ordered, 99)),
+            "max_ms": ms(ordered[-1] if ordered else None),
+        }
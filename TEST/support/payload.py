@@ -0,0 +1,88 @@
+"""Тела запросов заданного размера и разбор кривой "размер - задержка".
+
+Тело собирается как JSON в UTF-8 без экранирования (ensure_ascii=False),
+поэтому его размер на проводе известен точно: ASCII - 1 байт на символ,
+кириллица - 2, эмодзи - 4. requests с json= экранировал бы не-ASCII
+символы в \\uXXXX и раздувал тело в 3-6 раз.
+
+Содержимое заметки заполняется не больше чем до CONTENT_MAX_LENGTH
+символов, остальной объём - тем же алфавитом в поле padding. Сервер
+разбирает тело целиком (и проверяет лимит body-parser), но сохраняет
+только title и content, поэтому созданные заметки остаются в пределах
+лимитов, которые тесты соблюдают для своих заметок.
+"""
+import json
+import statistics
+from typing import Callable, Optional
+
+from support.schema import CONTENT_MAX_LENGTH
+
+# Алфавиты содержимого: символ размером 1, 2 и 4 байта в UTF-8
+ALPHABETS = {
+    "ascii": "a",
+    "cyrillic": "я",
+    "emoji": "😀",
+}
+
+
+def make_body(size: int, alphabet: str, title: str) -> bytes:
+    """JSON-тело заметки размером не больше size байт (но с непустым содержимым)"""
+    char = ALPHABETS[alphabet]
+    available = max(0, size - len(_encode(title, "", ""))) // len(char.encode("utf-8"))
+    content = max(1, min(CONTENT_MAX_LENGTH, available))
+    return _encode(title, char * content, char * max(0, available - content))
+
+
+def _encode(title: str, content: str, padding: str) -> bytes:
+    body = {"title": title, "content": content, "padding": padding}
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def find_limit(accepted: Callable[[int], bool], low: int, high: int) -> int:
+    """Бинарный поиск наибольшего принимаемого размера тела между low (принят) и high (отклонён)"""
+    while high - low > 1:
+        middle = (low + high) // 2
+        if accepted(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _fit(points: list) -> tuple:
+    """Прямая latency_ms = a + b * bytes методом наименьших квадратов"""
+    xs = [point["request_bytes"] for point in points]
+    ys = [point["median_ms"] for point in points]
+    x_mean, y_mean = statistics.fmean(xs), statistics.fmean(ys)
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / denominator if denominator else 0.0
+    slope = max(0.0, slope)  # задержка не убывает с размером: отрицательный наклон - шум малых тел
+    return y_mean - slope * x_mean, slope
+
+
+def linear_breakpoint(points: list, tolerance: float = 0.5, noise_ms: float = 1.0,
+                      min_points: int = 3) -> Optional[dict]:
+    """Где задержка перестаёт расти линейно от размера тела.
+
+    По принятым точкам (от меньших к большим) строится прямая; первая точка,
+    задержка которой превышает прогноз прямой по предыдущим точкам больше
+    чем на tolerance и больше чем на noise_ms, считается изломом. Возвращает
+    последний линейный размер, первый размер после излома и наклон (мс на
+    КиБ); None, если точек мало.
+    """
+    points = sorted((point for point in points if point["accepted"]), key=lambda point: point["request_bytes"])
+    if len(points) < min_points:
+        return None
+    for index in range(min_points, len(points)):
+        intercept, slope = _fit(points[:index])
+        predicted = intercept + slope * points[index]["request_bytes"]
+        excess = points[index]["median_ms"] - predicted
+        if excess > noise_ms and excess > predicted * tolerance:
+            return {
+                "linear_until_bytes": points[index - 1]["request_bytes"],
+                "breaks_at_bytes": points[index]["request_bytes"],
+                "ms_per_kib": round(slope * 1024, 4),
+            }
+    intercept, slope = _fit(points)
+    return {"linear_until_bytes": points[-1]["request_bytes"], "breaks_at_bytes": None,
+            "ms_per_kib": round(slope * 1024, 4)}
@@ -0,0 +1,133 @@
+"""Пул тестовых заметок, создаваемых заранее пакетами.
+
+Тесты только на чтение получают общие заметки пула (shared) и не делают
+собственный POST; тестам, которые меняют или удаляют заметку, выдаётся
+эксклюзивная заметка (exclusive), больше никому не достающаяся. Заметки
+создаются пакетами: пакетно в хранилище in-process заглушки, конкурентными
+POST для живого сервера и последовательно через HttpSession при работе
+с кассетами, чтобы обмены попали в запись.
+
+Пул следит за ответами HttpSession и AsyncHttpSession: заметки, созданные
+тестами через POST /note, тоже запоминаются, а удалённые тестами -
+забываются. В конце сессии cleanup() удаляет всё, что осталось, поэтому
+хранилище сервера не растёт от прогона к прогону.
+"""
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+from support.inprocess import NotesStore
+from support.metrics import endpoint_template
+from support.seeding import SEED_CONTENT, delete_notes, seed_notes
+
+
+class PooledNote(NamedTuple):
+    id: int
+    title: str
+    content: str
+
+
+class NotePool:
+    """Выдаёт заранее созданные заметки и удаляет оставшиеся в конце сессии"""
+
+    def __init__(self, http, base_url: str, make_title: Callable[[str], str],
+                 store: Optional[NotesStore] = None, shared_size: int = 3, batch_size: int = 10,
+                 through_session: bool = False, concurrency: int = 100):
+        self.http = http
+        self.base_url = base_url
+        self.make_title = make_title
+        self.store = store
+        self.shared_size = shared_size
+        self.batch_size = batch_size
+        self.through_session = through_session  # создавать и удалять через http (кассеты)
+        self.concurrency = concurrency
+        # RLock: при создании через http хук observe вызывается под той же блокировкой
+        self._lock = threading.RLock()
+        self._shared: List[PooledNote] = []
+        self._next_shared = 0
+        self._exclusive: List[PooledNote] = []
+        self._owned = set()  # ID заметок, которые нужно удалить в конце сессии
+        self._owned_direct = set()  # то же для заметок, созданных мимо HttpSession
+
+    def shared(self) -> PooledNote:
+        """Общая заметка для тестов, которые её не меняют (выдаются по кругу)"""
+        with self._lock:
+            if not self._shared:
+                self._shared = self._create(self.shared_size, "Общая заметка пула")
+            note = self._shared[self._next_shared % len(self._shared)]
+            self._next_shared += 1
+            return note
+
+    def exclusive(self) -> PooledNote:
+        """Заметка только для одного теста: её можно менять и удалять"""
+        with self._lock:
+            if not self._exclusive:
+                self._exclusive = self._create(self.batch_size, "Заметка пула")
+            return self._exclusive.pop()
+
+    def observe(self, resp):
+        """Хук HttpSession: запоминает созданные тестами заметки и забывает удалённые"""
+        self._track(resp, self._owned)
+
+    def observe_async(self, resp):
+        """Хук AsyncHttpSession: его запросы не проходят через кассеты, удаляются напрямую"""
+        self._track(resp, self._owned_direct)
+
+    def track(self, note_ids):
+        """Забирает на удаление заметки, созданные в обход сессий (например, стресс-прогоном)"""
+        with self._lock:
+            self._owned_direct.update(note_ids)
+
+    def cleanup(self) -> int:
+        """Удаляет все оставшиеся заметки пула и тестов; возвращает число удалённых"""
+        with self._lock:
+            ids, direct_ids = sorted(self._owned), sorted(self._owned_direct)
+            self._owned.clear()
+            self._owned_direct.clear()
+            self._shared, self._exclusive = [], []
+        deleted = 0
+        if self.through_session:
+            deleted = sum(1 for note_id in ids
+                          if self.http.delete(f"{self.base_url}/note/{note_id}", timeout=30).status_code == 204)
+        else:
+            direct_ids += ids
+        return deleted + delete_notes(self.base_url, direct_ids, store=self.store, concurrency=self.concurrency)
+
+    def _track(self, resp, owned: set):
+        endpoint = endpoint_template(resp.request.method, resp.url)
+        if endpoint == "POST /note" and resp.status_code == 201:
+            try:
+                note_id = resp.json()["id"]
+            except (ValueError, TypeError, KeyError):
+                return
+            with self._lock:
+                owned.add(note_id)
+        elif endpoint == "DELETE /note/:id" and resp.status_code == 204:
+            try:
+                note_id = int(str(resp.url).rstrip("/").rsplit("/", 1)[-1])
+            except ValueError:
+                return  # '123abc' и подобные: сервер сам приводит ID, точно не узнать
+            with self._lock:
+                self._owned.discard(note_id)
+                self._owned_direct.discard(note_id)
+
+    def _create(self, count: int, base_title: str) -> List[PooledNote]:
+        titles = []
+
+        def make_title(base: str) -> str:
+            titles.append(self.make_title(base))
+            return titles[-1]
+
+        if self.through_session:
+            ids = []
+            for _ in range(count):
+                response = self.http.post(f"{self.base_url}/note",
+                                          json={"title": make_title(base_title), "content": SEED_CONTENT},
+                                          timeout=30)
+                if response.status_code != 201:
+                    raise RuntimeError(f"Не удалось создать заметку пула, статус {response.status_code}")
+                ids.append(response.json()["id"])
+        else:
+            ids = seed_notes(self.base_url, count, make_title, store=self.store,
+                             concurrency=self.concurrency, base_title=base_title)
+        self._owned.update(ids)
+        return [PooledNote(note_id, title, SEED_CONTENT) for note_id, title in zip(ids, titles)]
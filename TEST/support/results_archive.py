@@ -0,0 +1,333 @@
+"""Сжатый архив результатов Allure вместо отдельного файла на каждый артефакт.
+
+ALLURE_BACKEND=archive заменяет файловый логгер allure-pytest: результаты,
+контейнеры и вложения каждого прогона дописываются в один ZIP-архив
+(deflate) под префиксом runs/<run_id>/. Центральный каталог ZIP служит
+индексом, поэтому список прогонов и выгрузка одного прогона не читают
+остальные данные.
+
+Во время прогона каждый воркер пишет во временный файл <архив>.<воркер>.part,
+в конце сессии он под файловой блокировкой переносится в общий архив.
+После этого применяются политики:
+    ротация  - архив больше ALLURE_ARCHIVE_MAX_MB переименовывается в
+               <архив>.1.zip (хранится ALLURE_ARCHIVE_ROTATE старых файлов);
+    хранение - в архиве остаются последние ALLURE_ARCHIVE_KEEP_RUNS прогонов
+               не старше ALLURE_ARCHIVE_MAX_AGE_DAYS дней. Удаление
+               переписывает архив целиком, поэтому после прогона оно
+               выполняется, только когда выбывших прогонов больше
+               ALLURE_ARCHIVE_PRUNE_SLACK.
+
+Выгрузка в обычный каталог Allure:
+    python -m support.results_archive export --run latest --to allure-results
+"""
+import argparse
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass
+from typing import Optional
+
+import allure_commons
+import pytest
+from allure_commons.logger import AllureFileLogger
+from attr import asdict
+
+BACKENDS = ("files", "archive")
+RUNS_PREFIX = "runs/"
+
+
+def allure_backend() -> str:
+    backend = os.getenv("ALLURE_BACKEND", "files")
+    if backend not in BACKENDS:
+        raise ValueError(f"ALLURE_BACKEND должен быть одним из {BACKENDS}, получен {backend}")
+    return backend
+
+
+def archive_path() -> pathlib.Path:
+    return pathlib.Path(os.getenv("ALLURE_ARCHIVE", "allure-archive/results.zip"))
+
+
+@dataclass
+class RetentionPolicy:
+    """Политики хранения и ротации; читаются из переменных окружения ALLURE_ARCHIVE_*"""
+    keep_runs: int = 20           # прогонов в активном архиве (0 - без ограничения)
+    max_age_days: float = 30.0    # максимальный возраст прогона (0 - без ограничения)
+    max_mb: float = 100.0         # размер архива, после которого он ротируется (0 - без ротации)
+    rotate: int = 3               # сколько ротированных архивов хранить
+    prune_slack: int = 10         # выбывших прогонов, после которых архив переписывается
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        return cls(
+            keep_runs=int(os.getenv("ALLURE_ARCHIVE_KEEP_RUNS", cls.keep_runs)),
+            max_age_days=float(os.getenv("ALLURE_ARCHIVE_MAX_AGE_DAYS", cls.max_age_days)),
+            max_mb=float(os.getenv("ALLURE_ARCHIVE_MAX_MB", cls.max_mb)),
+            rotate=int(os.getenv("ALLURE_ARCHIVE_ROTATE", cls.rotate)),
+            prune_slack=int(os.getenv("ALLURE_ARCHIVE_PRUNE_SLACK", cls.prune_slack)),
+        )
+
+
+class ArchiveLock:
+    """Межпроцессная блокировка архива через файл, созданный с O_EXCL"""
+
+    def __init__(self, path: pathlib.Path, timeout: float = 120, stale_after: float = 600):
+        self.path = path.with_name(path.name + ".lock")
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.stale_after:
+                        self.path.unlink()  # блокировка осталась от упавшего процесса
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Не удалось захватить блокировку {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        self.path.unlink(missing_ok=True)
+
+
+def _serialize(item) -> bytes:
+    # Тот же набор полей, что пишет AllureFileLogger
+    return json.dumps(asdict(item, filter=lambda _, v: v or v is False), ensure_ascii=False).encode("utf-8")
+
+
+class ArchiveLogger:
+    """Логгер allure_commons: пишет артефакты прогона в ZIP вместо отдельных файлов"""
+
+    def __init__(self, path: pathlib.Path, run_id: str, worker: str, policy: Optional[RetentionPolicy] = None):
+        self.path = pathlib.Path(path)
+        self.run_id = run_id
+        self.worker = worker
+        self.policy = policy or RetentionPolicy()
+        self.started = time.time()
+        self.files = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.part_path = self.path.with_name(f"{self.path.name}.{worker}.part")
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(self.part_path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, name: str, data: bytes):
+        """Добавляет файл прогона (имя - как в каталоге allure-results)"""
+        with self._lock:
+            self._zip.writestr(f"{RUNS_PREFIX}{self.run_id}/{name}", data)
+            self.files += 1
+
+    @allure_commons.hookimpl
+    def report_result(self, result):
+        self.add(result.file_pattern.format(prefix=uuid.uuid4()), _serialize(result))
+
+    @allure_commons.hookimpl
+    def report_container(self, container):
+        self.add(container.file_pattern.format(prefix=uuid.uuid4()), _serialize(container))
+
+    @allure_commons.hookimpl
+    def report_globals(self, globals_item):
+        self.add(globals_item.file_pattern.format(prefix=uuid.uuid4()), _serialize(globals_item))
+
+    @allure_commons.hookimpl
+    def report_attached_file(self, source, file_name):
+        self.add(file_name, pathlib.Path(source).read_bytes())
+
+    @allure_commons.hookimpl
+    def report_attached_data(self, body, file_name):
+        self.add(file_name, body.encode("utf-8") if isinstance(body, str) else body)
+
+    def close(self):
+        """Переносит артефакты воркера в общий архив и применяет политики хранения"""
+        meta = {"run_id": self.run_id, "worker": self.worker, "started": self.started,
+                "finished": time.time(), "files": self.files}
+        with self._lock:
+            self._zip.writestr(f"{RUNS_PREFIX}{self.run_id}/run-{self.worker}.json", json.dumps(meta))
+            self._zip.close()
+        with ArchiveLock(self.path):
+            rotate(self.path, self.policy)
+            with zipfile.ZipFile(self.part_path) as part, \
+                    zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_DEFLATED) as archive:
+                for info in part.infolist():
+                    archive.writestr(info, part.read(info))
+            self.part_path.unlink()
+            prune(self.path, self.policy)
+
+
+ARCHIVE_LOGGER_KEY = pytest.StashKey[ArchiveLogger]()
+
+
+def _is_meta(name: str) -> bool:
+    return pathlib.PurePosixPath(name).name.startswith("run-") and name.endswith(".json")
+
+
+def list_runs(path: pathlib.Path) -> list:
+    """Прогоны архива от старых к новым: run_id, время начала, воркеры, число и размер файлов"""
+    runs = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.filename.startswith(RUNS_PREFIX):
+                continue
+            run_id = info.filename[len(RUNS_PREFIX):].split("/", 1)[0]
+            run = runs.setdefault(run_id, {"run_id": run_id, "started": None, "workers": [],
+                                           "files": 0, "bytes": 0, "compressed_bytes": 0})
+            if _is_meta(info.filename):
+                meta = json.loads(archive.read(info))
+                run["workers"].append(meta["worker"])
+                run["started"] = min(filter(None, (run["started"], meta["started"])))
+                continue
+            run["files"] += 1
+            run["bytes"] += info.file_size
+            run["compressed_bytes"] += info.compress_size
+    return sorted(runs.values(), key=lambda run: run["started"] or 0)
+
+
+def _resolve(path: pathlib.Path, run_id: str) -> str:
+    runs = list_runs(path)
+    if not runs:
+        raise ValueError(f"В архиве {path} нет прогонов")
+    if run_id == "latest":
+        return runs[-1]["run_id"]
+    if run_id not in {run["run_id"] for run in runs}:
+        raise ValueError(f"Прогон {run_id} не найден в архиве {path}")
+    return run_id
+
+
+def export_run(path: pathlib.Path, run_id: str, destination: pathlib.Path) -> int:
+    """Выгружает прогон в обычный каталог результатов Allure; возвращает число файлов"""
+    run_id = _resolve(path, run_id)
+    prefix = f"{RUNS_PREFIX}{run_id}/"
+    destination.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.filename.startswith(prefix) and not _is_meta(info.filename):
+                (destination / info.filename[len(prefix):]).write_bytes(archive.read(info))
+                count += 1
+    return count
+
+
+def prune(path: pathlib.Path, policy: RetentionPolicy, force: bool = False) -> list:
+    """Удаляет из архива прогоны сверх keep_runs и старше max_age_days; возвращает их ID.
+
+    Без force архив не переписывается, пока выбывших прогонов не больше
+    prune_slack: стоимость перезаписи растёт с размером архива.
+    """
+    if not path.exists():
+        return []
+    runs = list_runs(path)
+    drop = set()
+    if policy.keep_runs and len(runs) > policy.keep_runs:
+        drop.update(run["run_id"] for run in runs[:-policy.keep_runs])
+    if policy.max_age_days:
+        oldest = time.time() - policy.max_age_days * 86400
+        drop.update(run["run_id"] for run in runs if run["started"] and run["started"] < oldest)
+    if not drop or (not force and len(drop) <= policy.prune_slack):
+        return []
+    # ZIP не умеет удалять записи - архив переписывается без выбывших прогонов
+    tmp_path = path.with_name(path.name + ".tmp")
+    with zipfile.ZipFile(path) as archive, \
+            zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as compacted:
+        for info in archive.infolist():
+            run_id = info.filename[len(RUNS_PREFIX):].split("/", 1)[0]
+            if run_id not in drop:
+                compacted.writestr(info, archive.read(info))
+    os.replace(tmp_path, path)
+    return sorted(drop)
+
+
+def rotate(path: pathlib.Path, policy: RetentionPolicy) -> bool:
+    """Если архив больше max_mb, сдвигает его в <архив>.1.zip, .1 в .2 и т.д."""
+    if not policy.max_mb or not path.exists() or path.stat().st_size < policy.max_mb * 2 ** 20:
+        return False
+
+    def rotated(index: int) -> pathlib.Path:
+        return path.with_name(f"{path.stem}.{index}{path.suffix}")
+
+    rotated(policy.rotate).unlink(missing_ok=True)
+    for index in range(policy.rotate - 1, 0, -1):
+        if rotated(index).exists():
+            os.replace(rotated(index), rotated(index + 1))
+    if policy.rotate:
+        os.replace(path, rotated(1))
+    else:
+        path.unlink()
+    return True
+
+
+def install(config, worker: str) -> ArchiveLogger:
+    """Заменяет файловый логгер allure-pytest логгером архива (в конце сессии - перенос в архив)"""
+    file_loggers = [(name, plugin) for name, plugin in allure_commons.plugin_manager.list_name_plugin()
+                    if isinstance(plugin, AllureFileLogger)]
+    for _, plugin in file_loggers:
+        allure_commons.plugin_manager.unregister(plugin)
+    # Воркеры xdist получают общий testrunuid - все они пишут в один прогон
+    run_id = getattr(config, "workerinput", {}).get("testrunuid") or uuid.uuid4().hex
+    logger = ArchiveLogger(archive_path(), f"{time.strftime('%Y%m%d')}-{run_id[:12]}", worker,
+                           RetentionPolicy.from_env())
+    allure_commons.plugin_manager.register(logger)
+    config.stash[ARCHIVE_LOGGER_KEY] = logger
+
+    def uninstall():
+        logger.close()
+        allure_commons.plugin_manager.unregister(logger)
+        # allure-pytest при завершении снимает свой логгер сам - возвращаем его на место
+        for name, plugin in file_loggers:
+            allure_commons.plugin_manager.register(plugin, name)
+
+    config.add_cleanup(uninstall)
+    return logger
+
+
+def write_result_file(config, name: str, data: bytes):
+    """Пишет файл результатов туда, куда пишет Allure: в архив или в каталог --alluredir"""
+    logger = config.stash.get(ARCHIVE_LOGGER_KEY, None)
+    if logger is not None:
+        logger.add(name, data)
+        return
+    results_dir = pathlib.Path(config.getoption("allure_report_dir", None) or "allure-results")
+    results_dir.mkdir(parents=True, exist_ok=True)
+    # Запись атомарная, чтобы воркеры не затирали файлы друг друга
+    tmp_path = results_dir / f"{name}.{uuid.uuid4().hex[:8]}.tmp"
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, results_dir / name)
+
+
+def _main(argv=None):
+    parser = argparse.ArgumentParser(description="Архив результатов Allure")
+    parser.add_argument("--archive", type=pathlib.Path, default=archive_path())
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="список прогонов")
+    export = commands.add_parser("export", help="выгрузка прогона в каталог Allure")
+    export.add_argument("--run", default="latest")
+    export.add_argument("--to", type=pathlib.Path, default=pathlib.Path("allure-results"))
+    commands.add_parser("prune", help="применить политики хранения и ротации")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for run in list_runs(args.archive):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started"] or 0))
+            print(f"{run['run_id']}  {started}  файлов: {run['files']}  "
+                  f"{run['bytes']} -> {run['compressed_bytes']} байт  воркеры: {','.join(sorted(run['workers']))}")
+    elif args.command == "export":
+        count = export_run(args.archive, args.run, args.to)
+        print(f"Выгружено файлов: {count} -> {args.to}")
+    else:
+        policy = RetentionPolicy.from_env()
+        with ArchiveLock(args.archive):
+            rotated = rotate(args.archive, policy)
+            dropped = prune(args.archive, policy, force=True)
+        print(f"Ротация: {'да' if rotated else 'нет'}; удалено прогонов: {len(dropped)}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,217 @@
+"""Компилируемая проверка модели заметки.
+
+Схема (упрощённое подмножество JSON Schema) один раз компилируется в
+функцию Python, поэтому проверка ответа не разбирает схему заново и на
+корректных данных не создаёт лишних объектов. Все нарушения возвращаются
+списком Violation(path, message), а не первым упавшим assert.
+"""
+import re
+from datetime import datetime
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+# Лимиты соответствуют тестам test_create_note_long_title / test_create_note_long_content.
+# Сервер их не проверяет, это не контракт API: лимиты применяются только к заметкам,
+# созданным самими тестами (CREATED_NOTE_SCHEMA), а не к чужим заметкам в общем хранилище
+TITLE_MAX_LENGTH = 500
+CONTENT_MAX_LENGTH = 2000
+
+_DATE_TIME = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}:\d{2})$")
+
+NOTE_SCHEMA = {
+    "type": "object",
+    "required": ["id", "title", "content", "created", "changed"],
+    "additionalProperties": False,
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "title": {"type": "string", "minLength": 1},
+        "content": {"type": "string", "minLength": 1},
+        "created": {"type": "string", "format": "date-time"},
+        "changed": {"type": "string", "format": "date-time"},
+    },
+    # Дополнительное правило модели: дата изменения не раньше даты создания
+    "notBefore": [("changed", "created")],
+}
+
+# Заметки, созданные тестами: модель API плюс лимиты длины
+CREATED_NOTE_SCHEMA = {
+    **NOTE_SCHEMA,
+    "properties": {
+        **NOTE_SCHEMA["properties"],
+        "title": {"type": "string", "minLength": 1, "maxLength": TITLE_MAX_LENGTH},
+        "content": {"type": "string", "minLength": 1, "maxLength": CONTENT_MAX_LENGTH},
+    },
+}
+
+
+class Violation(NamedTuple):
+    path: str
+    message: str
+
+    def __str__(self):
+        return f"{self.path}: {self.message}"
+
+
+# Выражения проверки типа; bool в Python - подкласс int, но в JSON это разные типы
+_TYPE_CHECKS = {
+    "string": "isinstance({value}, str)",
+    "integer": "type({value}) is int",
+}
+
+_MISSING = object()
+
+
+def _parse_date(value: str) -> datetime:
+    """Дата ISO-8601 из _DATE_TIME; дробная часть дополняется до 6 цифр (fromisoformat до Python 3.11)"""
+    match = _DATE_TIME.match(value)
+    if match is None:
+        raise ValueError(f"не дата ISO-8601: {value!r}")
+    fraction, zone = (match.group(1) or ".")[1:], match.group(2)
+    zone = "+00:00" if zone == "Z" else zone
+    return datetime.fromisoformat(f"{value[:19]}.{fraction:0<6}{zone}")
+
+
+def _earlier(first: str, second: str) -> Optional[bool]:
+    """first раньше second; None, если даты нельзя сравнить.
+
+    Строки в UTC одного формата сравниваются без разбора дат.
+    """
+    if len(first) == len(second) and first[-1] == second[-1] == "Z":
+        return first < second
+    try:
+        return _parse_date(first) < _parse_date(second)
+    except (ValueError, TypeError):
+        return None
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _field_source(name: str, schema: dict, required: bool) -> List[str]:
+    """Исходный код проверок одного поля (отступ - тело функции validate)"""
+    type_name = schema["type"]
+    lines = [
+        f"    value = data.get({name!r}, _MISSING)",
+        "    if value is _MISSING:",
+        f"        errors.append(Violation(_join(path, {name!r}), 'обязательное поле отсутствует'))"
+        if required else "        pass",
+        "    else:",
+        "        known += 1",
+        f"        if not ({_TYPE_CHECKS[type_name].format(value='value')}):",
+        f"            errors.append(Violation(_join(path, {name!r}),"
+        f" f'ожидался тип {type_name}, получен {{type(value).__name__}}'))",
+        "        else:",
+    ]
+    body = []
+    if "minimum" in schema:
+        body += [
+            f"            if value < {schema['minimum']!r}:",
+            f"                errors.append(Violation(_join(path, {name!r}), 'должно быть >= {schema['minimum']}'))",
+        ]
+    if "minLength" in schema or "maxLength" in schema:
+        body.append("            length = len(value)")
+    if "minLength" in schema:
+        body += [
+            f"            if length < {schema['minLength']!r}:",
+            f"                errors.append(Violation(_join(path, {name!r}), 'длина меньше {schema['minLength']}'))",
+        ]
+    if "maxLength" in schema:
+        body += [
+            f"            if length > {schema['maxLength']!r}:",
+            f"                errors.append(Violation(_join(path, {name!r}),"
+            f" f'длина {{length}} больше {schema['maxLength']}'))",
+        ]
+    if schema.get("format") == "date-time":
+        body += [
+            "            if not _DATE_TIME.match(value):",
+            f"                errors.append(Violation(_join(path, {name!r}), 'не дата ISO-8601'))",
+            "            else:",
+            f"                dated.add({name!r})",
+        ]
+    return lines + (body or ["            pass"])
+
+
+def compile_validator(schema: dict) -> Callable[..., List[Violation]]:
+    """Компилирует схему объекта в функцию validate(data, path='') -> [Violation].
+
+    По схеме генерируется исходный код одной функции без циклов по правилам,
+    поэтому корректная заметка проверяется за несколько сравнений.
+    """
+    required = set(schema.get("required", ()))
+    properties = schema["properties"]
+    source = [
+        "def validate(data, path=''):",
+        "    if not isinstance(data, dict):",
+        "        return [Violation(path or '$', f'ожидался объект, получен {type(data).__name__}')]",
+        "    errors = []",
+        "    known = 0",
+        "    dated = set()  # поля-даты, прошедшие проверку формата",
+    ]
+    for name, field in properties.items():
+        source += _field_source(name, field, name in required)
+    if not schema.get("additionalProperties", True):
+        source += [
+            "    if known != len(data):",
+            "        for name in data:",
+            "            if name not in PROPERTIES:",
+            "                errors.append(Violation(_join(path, name), 'поле не описано в модели'))",
+        ]
+    for later, earlier in schema.get("notBefore", ()):
+        source += [
+            # Порядок дат проверяется при любых других ошибках, если обе даты корректны
+            f"    if {later!r} in dated and {earlier!r} in dated:",
+            f"        order = _earlier(data[{later!r}], data[{earlier!r}])",
+            "        if order is None:",
+            f"            errors.append(Violation(_join(path, {later!r}), 'нельзя сравнить с {earlier}'))",
+            "        elif order:",
+            f"            errors.append(Violation(_join(path, {later!r}), 'раньше, чем {earlier}'))",
+        ]
+    source.append("    return errors")
+
+    namespace = {
+        "Violation": Violation,
+        "_MISSING": _MISSING,
+        "_DATE_TIME": _DATE_TIME,
+        "_earlier": _earlier,
+        "_join": _join,
+        "PROPERTIES": frozenset(properties),
+    }
+    exec(compile("\n".join(source), f"<schema validator {sorted(properties)}>", "exec"), namespace)
+    return namespace["validate"]
+
+
+validate_note = compile_validator(NOTE_SCHEMA)
+validate_created_note = compile_validator(CREATED_NOTE_SCHEMA)
+
+
+def validate_notes(notes: Iterable) -> List[Violation]:
+    """Пакетная проверка списка заметок; пути нарушений вида [3].title"""
+    violations = []
+    for index, note in enumerate(notes):
+        violations.extend(validate_note(note, f"[{index}]"))
+    return violations
+
+
+def _raise(violations: List[Violation], limit: int = 20):
+    shown = "\n".join(str(violation) for violation in violations[:limit])
+    more = f"\n... и ещё {len(violations) - limit}" if len(violations) > limit else ""
+    raise AssertionError(f"Заметка не соответствует модели данных:\n{shown}{more}")
+
+
+def assert_valid_note(note):
+    violations = validate_note(note)
+    if violations:
+        _raise(violations)
+
+
+def assert_valid_created_note(note):
+    """Заметка, созданная тестом: модель API и лимиты длины TITLE_MAX_LENGTH / CONTENT_MAX_LENGTH"""
+    violations = validate_created_note(note)
+    if violations:
+        _raise(violations)
+
+
+def assert_valid_notes(notes: Iterable):
+    violations = validate_notes(notes)
+    if violations:
+        _raise(violations)
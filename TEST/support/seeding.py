@@ -0,0 +1,62 @@
+"""Массовое наполнение API заметками и их удаление.
+
+Для in-process заглушки заметки добавляются пакетно прямо в хранилище,
+для живого сервера - конкурентными POST /note (и DELETE /note/:id)
+через AsyncHttpSession.
+"""
+import asyncio
+from typing import Callable, Optional
+
+from support.async_http import AsyncHttpSession
+from support.inprocess import NotesStore
+
+SEED_CONTENT = "Содержимое тестовой заметки"
+
+
+async def _post_many(base_url: str, titles: list, concurrency: int, timeout: float) -> list:
+    async with AsyncHttpSession(concurrency=concurrency, max_connections=concurrency,
+                                max_keepalive=concurrency, timeout=timeout) as session:
+        responses = await session.gather(*(
+            session.post(f"{base_url}/note", json={"title": title, "content": SEED_CONTENT})
+            for title in titles
+        ))
+    failed = [response.status_code for response in responses if response.status_code != 201]
+    if failed:
+        raise RuntimeError(f"Не удалось создать {len(failed)} заметок, статусы: {sorted(set(failed))}")
+    return [response.json()["id"] for response in responses]
+
+
+def seed_notes(base_url: str, count: int, make_title: Callable[[str], str],
+               store: Optional[NotesStore] = None, concurrency: int = 100,
+               batch_size: int = 10000, timeout: float = 30,
+               base_title: str = "Заметка для нагрузки") -> list:
+    """Создаёт count заметок и возвращает их ID"""
+    ids = []
+    for offset in range(0, count, batch_size):
+        titles = [make_title(base_title) for _ in range(min(batch_size, count - offset))]
+        if store is not None:
+            ids.extend(store.create_many((title, SEED_CONTENT) for title in titles))
+        else:
+            ids.extend(asyncio.run(_post_many(base_url, titles, concurrency, timeout)))
+    return ids
+
+
+async def _delete_many(base_url: str, ids: list, concurrency: int, timeout: float) -> int:
+    async with AsyncHttpSession(concurrency=concurrency, max_connections=concurrency,
+                                max_keepalive=concurrency, timeout=timeout) as session:
+        responses = await session.gather(*(session.delete(f"{base_url}/note/{note_id}") for note_id in ids))
+    # 409 - заметки уже нет (удалена самим тестом), это не ошибка очистки
+    return sum(1 for response in responses if response.status_code == 204)
+
+
+def delete_notes(base_url: str, ids, store: Optional[NotesStore] = None,
+                 concurrency: int = 100, timeout: float = 30, batch_size: int = 10000) -> int:
+    """Удаляет заметки по ID; возвращает число действительно удалённых"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    if store is not None:
+        return sum(1 for note_id in ids if store.delete(note_id))
+    # Пакетами, как при создании: не держим в памяти корутины для миллиона заметок
+    return sum(asyncio.run(_delete_many(base_url, ids[offset:offset + batch_size], concurrency, timeout))
+               for offset in range(0, len(ids), batch_size))
@@ -0,0 +1,207 @@
+"""Длительный (soak) прогон со слежением за дрейфом задержек и памяти.
+
+Операции нагрузочного прогона (support/bench.py) выполняются с постоянной
+частотой заданное время. Каждое окно (SOAK_WINDOW секунд) превращается в
+точку временного ряда: перцентили задержки, доля ошибок, размер хранилища
+(по GET /notes) и RSS процесса сервера, если его можно измерить. Точки
+дописываются в файл JSON Lines по мере прогона, поэтому многочасовой ряд
+не теряется при обрыве. По окончании ряд проверяется на рост p95 и RSS
+относительно начала прогона и рисуется SVG-график для Allure.
+"""
+import json
+import os
+import pathlib
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from support.bench import Workload, drive_open, parse_mix
+from support.metrics import LatencyRecorder
+
+# Сбалансированная смесь: создание и удаление уравновешены, чтобы хранилище
+# не росло само по себе и рост памяти указывал на утечку, а не на данные
+DEFAULT_MIX = {"create": 1, "read": 4, "update": 2, "delete": 1, "list": 1, "search": 2}
+
+# Метрики, рост которых считается дрейфом
+DRIFT_METRICS = ("p95_ms", "rss_mb")
+
+
+@dataclass
+class SoakConfig:
+    """Параметры soak-прогона; читаются из переменных окружения SOAK_*"""
+    duration: float = 3600.0      # длительность прогона, секунды
+    window: float = 60.0          # длина окна, секунды
+    rate: float = 20.0            # запросов в секунду
+    seed_notes: int = 20          # заметок, создаваемых до прогона
+    tolerance: float = 0.25       # допустимый рост метрики к концу прогона (0.25 = 25%)
+    server_pid: Optional[int] = None  # PID живого сервера для замера RSS
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+
+    @classmethod
+    def from_env(cls) -> "SoakConfig":
+        pid = os.getenv("SOAK_SERVER_PID")
+        config = cls(
+            duration=float(os.getenv("SOAK_DURATION", cls.duration)),
+            window=float(os.getenv("SOAK_WINDOW", cls.window)),
+            rate=float(os.getenv("SOAK_RATE", cls.rate)),
+            seed_notes=int(os.getenv("SOAK_SEED_NOTES", cls.seed_notes)),
+            tolerance=float(os.getenv("SOAK_DRIFT_TOLERANCE", cls.tolerance)),
+            server_pid=int(pid) if pid else None,
+        )
+        if os.getenv("SOAK_MIX"):
+            config.mix = parse_mix(os.environ["SOAK_MIX"], variable="SOAK_MIX")
+        return config
+
+
+def read_rss(pid: int) -> Optional[int]:
+    """Текущий RSS процесса в байтах (Linux, /proc); None, если недоступно"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+async def _store_size(session, base_url: str) -> Optional[int]:
+    try:
+        response = await session.get(f"{base_url}/notes", timeout=120)
+    except Exception:
+        return None
+    if response.status_code == 404:
+        return 0  # сервер отвечает 404 на пустое хранилище
+    return len(response.json()) if response.status_code == 200 else None
+
+
+def detect_drift(points: list, metric: str, tolerance: float, warmup: int = 1) -> Optional[dict]:
+    """Сравнивает медианы первой и последней четверти ряда (без окон прогрева).
+
+    Дрейф - рост больше tolerance при положительном наклоне линейного тренда.
+    None, если точек слишком мало для вывода.
+    """
+    series = [(point["window"], point[metric]) for point in points[warmup:] if point.get(metric) is not None]
+    if len(series) < 4:
+        return None
+    values = [value for _, value in series]
+    quarter = max(2, len(values) // 4)
+    head, tail = statistics.median(values[:quarter]), statistics.median(values[-quarter:])
+    growth = (tail - head) / head if head else 0.0
+    xs = [index for index, _ in series]
+    x_mean, y_mean = statistics.fmean(xs), statistics.fmean(values)
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in series) / denominator if denominator else 0.0
+    return {
+        "metric": metric,
+        "start": round(head, 3),
+        "end": round(tail, 3),
+        "growth": round(growth, 3),
+        "slope_per_window": round(slope, 4),
+        "drift": growth > tolerance and slope > 0,
+    }
+
+
+async def run_soak(session, base_url: str, config: SoakConfig, make_title: Callable[[str], str],
+                   rss_pid: Optional[int] = None, output: Optional[pathlib.Path] = None) -> dict:
+    """Запускает soak-прогон и возвращает отчёт с рядом точек и оценкой дрейфа"""
+    workload = Workload(session, base_url, make_title)
+    await workload.seed(config.seed_notes)
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text("", encoding="utf-8")
+
+    points = []
+    started = time.perf_counter()
+    finish = started + config.duration
+    window_start = started
+    while window_start < finish:
+        window_end = min(window_start + config.window, finish)
+        workload.recorder = LatencyRecorder()  # статистика только текущего окна
+        await drive_open(workload, config.mix, config.rate, window_start, window_end)
+        elapsed = time.perf_counter() - window_start
+        total = workload.recorder.summary(elapsed)["total"]
+        rss = read_rss(rss_pid) if rss_pid else None
+        point = {
+            "window": len(points),
+            "t_s": round(window_end - started, 1),
+            "count": total["count"],
+            "rps": total["rps"],
+            "p50_ms": total["p50_ms"],
+            "p95_ms": total["p95_ms"],
+            "p99_ms": total["p99_ms"],
+            "error_rate": round(total["errors"] / total["count"], 4) if total["count"] else None,
+            "store_size": await _store_size(session, base_url),
+            "rss_mb": round(rss / 2 ** 20, 2) if rss is not None else None,
+        }
+        points.append(point)
+        if output is not None:
+            with output.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(point, ensure_ascii=False) + "\n")
+        # Следующее окно начинается после замера размера хранилища, без догоняющей пачки запросов
+        window_start = max(window_end, time.perf_counter())
+
+    trends = [trend for trend in (detect_drift(points, metric, config.tolerance) for metric in DRIFT_METRICS)
+              if trend is not None]
+    return {
+        "config": {
+            "duration": config.duration,
+            "window": config.window,
+            "rate": config.rate,
+            "seed_notes": config.seed_notes,
+            "tolerance": config.tolerance,
+            "mix": config.mix,
+            "rss_pid": rss_pid,
+        },
+        "points": points,
+        "trends": trends,
+        "drift": [trend["metric"] for trend in trends if trend["drift"]],
+    }
+
+
+def render_chart(points: list, width: int = 720, panel_height: int = 120) -> str:
+    """SVG-график ряда: отдельная панель на каждую метрику"""
+    panels = [
+        ("p95_ms", "p95, мс", "#d62728"),
+        ("p50_ms", "p50, мс", "#1f77b4"),
+        ("error_rate", "Доля ошибок", "#ff7f0e"),
+        ("store_size", "Заметок в хранилище", "#2ca02c"),
+        ("rss_mb", "RSS, МБ", "#9467bd"),
+    ]
+    panels = [panel for panel in panels if any(point.get(panel[0]) is not None for point in points)]
+    left, right, top, gap = 60, 10, 20, 30
+    height = top + len(panels) * (panel_height + gap)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="sans-serif" font-size="11">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+    ]
+    span = max((point["t_s"] for point in points), default=0) or 1
+    for index, (metric, label, color) in enumerate(panels):
+        y0 = top + index * (panel_height + gap)
+        series = [(point["t_s"], point[metric]) for point in points if point.get(metric) is not None]
+        low = min(value for _, value in series)
+        high = max(value for _, value in series)
+        scale = (high - low) or 1
+
+        def x(t):
+            return left + (width - left - right) * t / span
+
+        def y(value):
+            return y0 + panel_height - panel_height * (value - low) / scale
+
+        coordinates = " ".join(f"{x(t):.1f},{y(value):.1f}" for t, value in series)
+        parts += [
+            f'<text x="{left}" y="{y0 - 5}" font-weight="bold">{label}</text>',
+            f'<rect x="{left}" y="{y0}" width="{width - left - right}" height="{panel_height}" '
+            f'fill="none" stroke="#ccc"/>',
+            f'<text x="{left - 5}" y="{y0 + 10}" text-anchor="end">{high:g}</text>',
+            f'<text x="{left - 5}" y="{y0 + panel_height}" text-anchor="end">{low:g}</text>',
+            f'<polyline points="{coordinates}" fill="none" stroke="{color}" stroke-width="1.5"/>',
+        ]
+    parts += [
+        f'<text x="{width - right}" y="{height - 5}" text-anchor="end">время, с (всего {span:g})</text>',
+        "</svg>",
+    ]
+    return "\n".join(parts)
@@ -0,0 +1,114 @@
+"""Потоковый разбор и проверка больших JSON-массивов.
+
+Элементы массива разбираются по мере чтения ответа (stream=True), поэтому
+память не зависит от длины списка, а проверка останавливается на первом
+нарушении, не дочитывая ответ.
+"""
+import codecs
+import json
+from typing import Callable, Iterable, Iterator
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = ".eE+-0123456789"
+
+
+class StreamValidationError(AssertionError):
+    """Нарушение в элементе потока; index - позиция элемента в массиве"""
+
+    def __init__(self, index: int, message: str):
+        super().__init__(f"Элемент #{index}: {message}")
+        self.index = index
+
+
+def _may_continue(item, next_char: str) -> bool:
+    """Число, за которым в буфере пусто или идёт символ числа, может быть прочитано не целиком"""
+    if isinstance(item, bool) or not isinstance(item, (int, float)):
+        return False
+    return next_char == "" or next_char in _NUMBER_CHARS
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Выдаёт элементы JSON-массива из последовательности байтовых кусков"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer, pos, finished = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, finished
+        if finished:
+            return False
+        try:
+            data = next(chunks)
+        except StopIteration:
+            buffer = buffer[pos:] + decoder.decode(b"", final=True)
+            pos, finished = 0, True
+            return True
+        # Отбрасываем уже разобранную часть, чтобы буфер не рос со списком
+        buffer, pos = buffer[pos:] + decoder.decode(data), 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != "[":
+        raise ValueError("Ожидался JSON-массив")
+    pos += 1
+    expect_item = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError("Неожиданный конец JSON-массива")
+        char = buffer[pos]
+        if char == "]":
+            return
+        if not expect_item:
+            if char != ",":
+                raise ValueError(f"Ожидалась ',' в позиции {pos}")
+            pos += 1
+            expect_item = True
+            continue
+        try:
+            item, end = _DECODER.raw_decode(buffer, pos)
+        except ValueError:
+            # Элемент ещё не прочитан целиком - дочитываем поток
+            if not fill():
+                raise
+            continue
+        if _may_continue(item, buffer[end:end + 1]) and not finished:
+            # Число на границе куска может продолжаться в следующем (77966| -> 77966.5, 9.5e| -> 9.5e3)
+            fill()
+            continue
+        pos = end
+        expect_item = False
+        yield item
+
+
+def iter_response_array(response, chunk_size: int = 64 * 1024) -> Iterator:
+    """Элементы JSON-массива из ответа, запрошенного с stream=True"""
+    try:
+        yield from iter_json_array(response.iter_content(chunk_size=chunk_size))
+    finally:
+        response.close()
+
+
+def validate_stream(items: Iterable, check: Callable[[object], None]) -> int:
+    """Проверяет элементы по мере поступления; возвращает их число.
+
+    check вызывается для каждого элемента и сообщает о нарушении через
+    AssertionError; первое нарушение прерывает чтение.
+    """
+    count = 0
+    for index, item in enumerate(items):
+        try:
+            check(item)
+        except AssertionError as error:
+            raise StreamValidationError(index, str(error)) from error
+        count += 1
+    return count
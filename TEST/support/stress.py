@@ -0,0 +1,274 @@
+"""Стресс-прогон изменяющих эндпоинтов и проверка согласованности.
+
+Пул потоков выполняет вперемешку создание, обновление, удаление и чтение
+небольшого общего набора заметок, поэтому PUT и DELETE одной заметки
+постоянно пересекаются. Каждая операция записывается в журнал с временем
+начала и конца; после прогона журнал сверяется с моделью хранилища:
+
+    unique_ids     - POST не выдаёт один ID дважды
+    lost_update    - итоговое состояние заметки - одна из последних записей
+                     (никакая успешная запись, начатая позже, не потеряна)
+    stale_read     - чтение не возвращает значение, перезаписанное до начала чтения
+    phantom_read   - чтение не возвращает значение, которого никто не записывал
+    model          - ответы соответствуют модели (changed не раньше created)
+    deleted        - заметка удаляется один раз и после удаления отвечает 404
+    missing        - существующая заметка не пропадает без удаления
+
+Пул процессов здесь не используется: нагрузка упирается в ввод-вывод, а
+in-process заглушка живёт в памяти одного процесса.
+"""
+import itertools
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import requests
+
+from support.bench import parse_mix
+from support.inprocess import InProcessAdapter, NotesStore
+from support.schema import validate_note
+
+DEFAULT_MIX = {"create": 2, "read": 4, "update": 3, "delete": 1}
+
+# Сколько аномалий каждого вида попадает в отчёт (счётчики - полные)
+ANOMALY_LIMIT = 20
+
+
+@dataclass
+class StressConfig:
+    """Параметры стресс-прогона; читаются из переменных окружения STRESS_*"""
+    duration: float = 5.0         # длительность прогона, секунды
+    workers: int = 16             # число потоков
+    notes: int = 10               # размер общего набора заметок в начале
+    timeout: float = 10.0         # таймаут одного запроса, секунды
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+
+    @classmethod
+    def from_env(cls) -> "StressConfig":
+        config = cls(
+            duration=float(os.getenv("STRESS_DURATION", cls.duration)),
+            workers=int(os.getenv("STRESS_WORKERS", cls.workers)),
+            notes=int(os.getenv("STRESS_NOTES", cls.notes)),
+            timeout=float(os.getenv("STRESS_TIMEOUT", cls.timeout)),
+        )
+        if os.getenv("STRESS_MIX"):
+            config.mix = parse_mix(os.environ["STRESS_MIX"], allowed=DEFAULT_MIX, variable="STRESS_MIX")
+        return config
+
+
+@dataclass
+class Operation:
+    """Запись журнала: операция над заметкой и её результат"""
+    kind: str                     # create, read, update, delete, final (итоговое чтение)
+    note_id: Optional[int]
+    start: float
+    end: float = 0.0
+    status: Optional[int] = None  # None - исключение при запросе
+    value: Optional[tuple] = None  # (title, content): записанное (create/update) или прочитанное (read)
+    body: Optional[dict] = None
+    error: str = ""
+
+
+def make_session(store: Optional[NotesStore] = None) -> requests.Session:
+    """Отдельная сессия для потока (requests.Session не рассчитана на общий доступ)"""
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    if store is not None:
+        adapter = InProcessAdapter(store)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+class StressRun:
+    """Выполняет операции из пула потоков и ведёт журнал"""
+
+    def __init__(self, base_url: str, config: StressConfig, make_title: Callable[[str], str],
+                 session_factory: Callable[[], requests.Session]):
+        self.base_url = base_url
+        self.config = config
+        self.make_title = make_title
+        self.session_factory = session_factory
+        self.log = []
+        self.ids = []             # общий набор заметок, включая удалённые
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sequence = itertools.count(1)
+
+    def run(self) -> float:
+        """Создаёт общий набор, выполняет прогон; возвращает его длительность"""
+        for _ in range(self.config.notes):
+            self.create()
+        operations, weights = zip(*self.config.mix.items())
+        started = time.perf_counter()
+        deadline = started + self.config.duration
+
+        def worker():
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                operation = rng.choices(operations, weights=weights)[0] if self.ids else "create"
+                getattr(self, operation)(rng)
+
+        with ThreadPoolExecutor(max_workers=self.config.workers) as executor:
+            for future in [executor.submit(worker) for _ in range(self.config.workers)]:
+                future.result()
+            elapsed = time.perf_counter() - started
+            # Итоговое состояние читается после остановки всех операций прогона
+            list(executor.map(lambda note_id: self.read(note_id=note_id, final=True), list(self.ids)))
+        return elapsed
+
+    @property
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = self.session_factory()
+        return self._local.session
+
+    def _call(self, operation: Operation, method: str, url: str, **kwargs) -> Operation:
+        try:
+            response = self.session.request(method, url, timeout=self.config.timeout, **kwargs)
+            operation.status = response.status_code
+            if response.status_code in (200, 201):
+                operation.body = response.json()
+        except (requests.RequestException, ValueError) as error:
+            operation.error = f"{type(error).__name__}: {error}"
+        operation.end = time.perf_counter()
+        with self._lock:
+            self.log.append(operation)
+        return operation
+
+    def _value(self) -> tuple:
+        sequence = next(self._sequence)
+        return self.make_title(f"Стресс-версия {sequence}"), f"Содержимое версии {sequence}"
+
+    def _pick(self, rng: random.Random) -> int:
+        with self._lock:
+            return rng.choice(self.ids)
+
+    def create(self, rng: Optional[random.Random] = None):
+        title, content = self._value()
+        operation = self._call(Operation("create", None, time.perf_counter(), value=(title, content)),
+                               "POST", f"{self.base_url}/note", json={"title": title, "content": content})
+        if operation.status == 201 and operation.body:
+            operation.note_id = operation.body.get("id")
+            with self._lock:
+                self.ids.append(operation.note_id)
+
+    def read(self, rng: Optional[random.Random] = None, note_id: Optional[int] = None, final: bool = False):
+        note_id = self._pick(rng) if note_id is None else note_id
+        operation = self._call(Operation("final" if final else "read", note_id, time.perf_counter()),
+                               "GET", f"{self.base_url}/note/{note_id}")
+        if operation.status == 200 and operation.body:
+            operation.value = (operation.body.get("title"), operation.body.get("content"))
+
+    def update(self, rng: random.Random):
+        note_id = self._pick(rng)
+        title, content = self._value()
+        self._call(Operation("update", note_id, time.perf_counter(), value=(title, content)),
+                   "PUT", f"{self.base_url}/note/{note_id}", json={"title": title, "content": content})
+
+    def delete(self, rng: random.Random):
+        note_id = self._pick(rng)
+        self._call(Operation("delete", note_id, time.perf_counter()), "DELETE", f"{self.base_url}/note/{note_id}")
+
+
+def check_invariants(log: list) -> dict:
+    """Сверяет журнал с моделью; возвращает {вид аномалии: [описания]}"""
+    anomalies = defaultdict(list)
+
+    def report(kind: str, operation: Operation, message: str):
+        anomalies[kind].append(
+            f"{operation.kind} #{operation.note_id} [{operation.start:.6f}-{operation.end:.6f}] "
+            f"статус {operation.status}: {message}"
+        )
+
+    expected = {"create": (201,), "read": (200, 404), "final": (200, 404),
+                "update": (200, 204, 409), "delete": (204, 409)}
+    for operation in log:
+        if operation.status not in expected[operation.kind]:
+            report("unexpected_status", operation, operation.error or "неожиданный статус")
+        if operation.body and operation.kind in ("create", "read", "final"):
+            violations = validate_note(operation.body)
+            if violations:
+                report("model", operation, "; ".join(str(violation) for violation in violations))
+
+    created = Counter(operation.note_id for operation in log if operation.kind == "create" and operation.status == 201)
+    for note_id, count in created.items():
+        if count > 1:
+            anomalies["unique_ids"].append(f"ID {note_id} выдан {count} раз")
+
+    by_note = defaultdict(list)
+    for operation in log:
+        if operation.note_id is not None:
+            by_note[operation.note_id].append(operation)
+
+    for note_id, operations in by_note.items():
+        writes = [operation for operation in operations
+                  if (operation.kind == "create" and operation.status == 201)
+                  or (operation.kind == "update" and operation.status in (200, 204))]
+        deletes = [operation for operation in operations if operation.kind == "delete" and operation.status == 204]
+        delete_starts = [operation.start for operation in operations if operation.kind == "delete"]
+        written = {write.value for write in writes}
+
+        if len(deletes) > 1:
+            report("deleted", deletes[1], f"заметка удалена {len(deletes)} раз")
+        deleted_at = min((operation.end for operation in deletes), default=None)
+
+        for operation in operations:
+            succeeded = operation.status in (200, 204) and operation.kind != "create"
+            if deleted_at is not None and operation.start > deleted_at and succeeded:
+                report("deleted", operation, "заметка доступна после завершённого удаления")
+            # Ошибка "не найдено" без пересекающегося или предшествующего DELETE - заметка пропала
+            not_found = (operation.kind in ("read", "final") and operation.status == 404) \
+                or (operation.kind == "update" and operation.status == 409)
+            if not_found and not any(start < operation.end for start in delete_starts):
+                report("missing", operation, "заметка не найдена, хотя её никто не удалял")
+
+            if operation.kind not in ("read", "final") or operation.value is None:
+                continue
+            if operation.value not in written:
+                report("phantom_read", operation, f"прочитано незаписанное значение {operation.value!r}")
+                continue
+            # Значение перезаписано: другая успешная запись началась после окончания исходной
+            # и завершилась до начала чтения
+            sources = [write for write in writes if write.value == operation.value]
+            if all(any(other.start > source.end and other.end < operation.start for other in writes)
+                   for source in sources):
+                kind = "lost_update" if operation.kind == "final" else "stale_read"
+                report(kind, operation, f"значение {operation.value!r} уже перезаписано")
+    return anomalies
+
+
+def summarize(log: list, elapsed: float, anomalies: dict, config: StressConfig) -> dict:
+    """Отчёт прогона: пропускная способность, статусы операций и аномалии"""
+    measured = [operation for operation in log if operation.kind != "final"]
+    statuses = defaultdict(Counter)
+    for operation in measured:
+        statuses[operation.kind][str(operation.status)] += 1
+    return {
+        "config": {
+            "duration": config.duration,
+            "workers": config.workers,
+            "notes": config.notes,
+            "mix": config.mix,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "operations": len(measured),
+        "throughput_ops": round(len(measured) / elapsed, 1) if elapsed else None,
+        "statuses": {kind: dict(counter) for kind, counter in sorted(statuses.items())},
+        "anomaly_counts": {kind: len(items) for kind, items in sorted(anomalies.items())},
+        "anomalies": {kind: items[:ANOMALY_LIMIT] for kind, items in sorted(anomalies.items())},
+    }
+
+
+def run_stress(base_url: str, config: StressConfig, make_title: Callable[[str], str],
+               session_factory: Callable[[], requests.Session]) -> tuple:
+    """Запускает стресс-прогон; возвращает (отчёт, ID всех затронутых заметок)"""
+    run = StressRun(base_url, config, make_title, session_factory)
+    elapsed = run.run()
+    report = summarize(run.log, elapsed, check_invariants(run.log), config)
+    return report, list(run.ids)
@@ -0,0 +1,247 @@
+"""Фазы времени каждого HTTP-запроса и их агрегация по шаблонам эндпоинтов.
+
+TimingAdapter - HTTPAdapter, пул которого создаёт соединения с замером фаз:
+DNS, TCP connect, TLS, время до первого байта, отправленные байты и
+признак повторного использования соединения. Повторы запросов (urllib3
+Retry) считаются по истории resp.raw.retries. Фазы прикрепляются к ответу
+urllib3 (resp.raw.timing), а TimingCollector собирает их через
+HttpSession.response_hooks и выгружает в JSON и формат Prometheus.
+
+DNS замеряется отдельным вызовом getaddrinfo перед подключением, поэтому
+connect включает повторное (обычно закешированное) разрешение имени.
+Для in-process заглушки и кассет сетевых фаз нет - учитываются только
+общее время и объём данных.
+"""
+import json
+import socket
+import time
+from collections import defaultdict
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from support.metrics import endpoint_template, percentile
+
+PHASES = ("dns", "connect", "tls", "ttfb", "total")
+
+
+class _TimedConnectionMixin:
+    """Замер фаз соединения; результат - атрибут timing у ответа urllib3"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._phases = {}
+        self._bytes_sent = 0
+        self._requests_served = 0
+        self._sent_at = None
+        self._reused = False
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            pass  # ошибку разрешения имени покажет само подключение
+        resolved = time.perf_counter()
+        sock = super()._new_conn()
+        self._phases["dns"] = resolved - started
+        self._phases["connect"] = time.perf_counter() - resolved
+        self._requests_served = 0
+        return sock
+
+    def request(self, method, url, body=None, headers=None, **kwargs):
+        self._reused = self._requests_served > 0 and self.sock is not None
+        self._bytes_sent = 0
+        super().request(method, url, body=body, headers=headers, **kwargs)
+        self._sent_at = time.perf_counter()
+
+    def send(self, data):
+        self._bytes_sent += len(data) if isinstance(data, (bytes, bytearray, str)) else 0
+        return super().send(data)
+
+    def getresponse(self):
+        response = super().getresponse()
+        # Для переиспользованного соединения фаз подключения нет (None), перцентили считаются по новым
+        timing = {phase: self._phases.get(phase) for phase in ("dns", "connect", "tls")}
+        timing["ttfb"] = time.perf_counter() - self._sent_at if self._sent_at else None
+        timing["bytes_sent"] = self._bytes_sent
+        timing["reused"] = self._reused
+        response.timing = timing
+        self._phases = {}
+        self._requests_served += 1
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - started
+        self._phases["tls"] = max(0.0, total - self._phases.get("dns", 0.0) - self._phases.get("connect", 0.0))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """HTTPAdapter с замером фаз соединения (socket_options передаются соединениям пула)"""
+
+    def __init__(self, *args, socket_options=None, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def _received_bytes(resp) -> int:
+    """Байты ответа: строка статуса, заголовки и тело в том виде, как пришло по сети"""
+    head = len(f"HTTP/1.1 {resp.status_code} {resp.reason}\r\n") + 2
+    head += sum(len(name) + len(value) + 4 for name, value in resp.headers.items())
+    raw = getattr(resp, "raw", None)
+    wire = raw.tell() if raw is not None and hasattr(raw, "tell") else 0
+    if not wire and isinstance(getattr(resp, "_content", None), bytes):
+        wire = len(resp._content)
+    if not wire:
+        # Тело ещё не прочитано (stream=True): не читаем его здесь, берём длину из заголовка
+        wire = int(resp.headers.get("Content-Length") or 0)
+    return head + wire
+
+
+class TimingCollector:
+    """Собирает фазы запросов по шаблонам эндпоинтов"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def observe(self, resp):
+        """Хук HttpSession: вызывается для каждого полученного ответа"""
+        phases = getattr(resp.raw, "timing", None) or {}
+        total = getattr(resp, "total_elapsed", None)
+        body = resp.request.body or b""
+        retries = getattr(getattr(resp, "raw", None), "retries", None)
+        self.samples[endpoint_template(resp.request.method, resp.url)].append({
+            "dns": phases.get("dns"),
+            "connect": phases.get("connect"),
+            "tls": phases.get("tls"),
+            "ttfb": phases.get("ttfb"),
+            "total": total if total is not None else resp.elapsed.total_seconds(),
+            "bytes_sent": phases.get("bytes_sent", len(body)),
+            "bytes_received": _received_bytes(resp),
+            "reused": phases.get("reused"),
+            "retries": len(getattr(retries, "history", None) or ()),
+        })
+
+    def summary(self) -> dict:
+        """Сводка по эндпоинтам: перцентили фаз (мс), байты, переиспользование соединений"""
+        result = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            entry = {
+                "count": len(samples),
+                "bytes_sent": sum(sample["bytes_sent"] for sample in samples),
+                "bytes_received": sum(sample["bytes_received"] for sample in samples),
+                "connections_reused": sum(1 for sample in samples if sample["reused"]),
+                "connections_new": sum(1 for sample in samples if sample["reused"] is False),
+                "retries": sum(sample["retries"] for sample in samples),
+            }
+            for phase in PHASES:
+                values = sorted(sample[phase] for sample in samples if sample[phase] is not None)
+                entry[phase] = {
+                    "sum_ms": round(sum(values) * 1000, 3),
+                    "p50_ms": None if not values else round(percentile(values, 50) * 1000, 3),
+                    "p95_ms": None if not values else round(percentile(values, 95) * 1000, 3),
+                }
+            result[endpoint] = entry
+        return result
+
+    def reuse_ratio(self):
+        """Доля запросов на переиспользованных соединениях (None без сетевых замеров)"""
+        flags = [sample["reused"] for samples in self.samples.values() for sample in samples
+                 if sample["reused"] is not None]
+        return round(sum(flags) / len(flags), 3) if flags else None
+
+    def connection_stats(self) -> dict:
+        """Итог по соединениям за прогон: запросы, новые и переиспользованные соединения, повторы"""
+        samples = [sample for samples in self.samples.values() for sample in samples]
+        return {
+            "requests": len(samples),
+            "connections_new": sum(1 for sample in samples if sample["reused"] is False),
+            "connections_reused": sum(1 for sample in samples if sample["reused"]),
+            "reuse_ratio": self.reuse_ratio(),
+            "retries": sum(sample["retries"] for sample in samples),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "notes_api") -> str:
+        """Текстовый формат экспозиции Prometheus"""
+        def label(endpoint: str, **extra) -> str:
+            pairs = {"endpoint": endpoint, **extra}
+            escaped = (
+                key + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for key, value in pairs.items()
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Полное время запроса",
+            f"# TYPE {prefix}_request_duration_seconds summary",
+        ]
+        for endpoint, samples in sorted(self.samples.items()):
+            totals = sorted(sample["total"] for sample in samples)
+            for quantile in (0.5, 0.95, 0.99):
+                lines.append(f"{prefix}_request_duration_seconds{label(endpoint, quantile=quantile)} "
+                             f"{percentile(totals, quantile * 100):.6f}")
+            lines.append(f"{prefix}_request_duration_seconds_sum{label(endpoint)} {sum(totals):.6f}")
+            lines.append(f"{prefix}_request_duration_seconds_count{label(endpoint)} {len(totals)}")
+
+        lines += [
+            f"# HELP {prefix}_request_phase_seconds_total Суммарное время фаз запросов",
+            f"# TYPE {prefix}_request_phase_seconds_total counter",
+        ]
+        for endpoint, samples in sorted(self.samples.items()):
+            for phase in ("dns", "connect", "tls", "ttfb"):
+                total = sum(sample[phase] for sample in samples if sample[phase] is not None)
+                lines.append(f"{prefix}_request_phase_seconds_total{label(endpoint, phase=phase)} {total:.6f}")
+
+        for metric, key, help_text in (
+            ("bytes_sent_total", "bytes_sent", "Отправлено байт"),
+            ("bytes_received_total", "bytes_received", "Получено байт"),
+        ):
+            lines += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} counter"]
+            for endpoint, samples in sorted(self.samples.items()):
+                lines.append(f"{prefix}_{metric}{label(endpoint)} {sum(sample[key] for sample in samples)}")
+
+        lines += [
+            f"# HELP {prefix}_connections_total Запросы по типу соединения",
+            f"# TYPE {prefix}_connections_total counter",
+        ]
+        for endpoint, samples in sorted(self.samples.items()):
+            for state, flag in (("reused", True), ("new", False)):
+                count = sum(1 for sample in samples if sample["reused"] is flag)
+                lines.append(f"{prefix}_connections_total{label(endpoint, state=state)} {count}")
+
+        lines += [
+            f"# HELP {prefix}_retries_total Повторы запросов",
+            f"# TYPE {prefix}_retries_total counter",
+        ]
+        for endpoint, samples in sorted(self.samples.items()):
+            lines.append(f"{prefix}_retries_total{label(endpoint)} {sum(sample['retries'] for sample in samples)}")
+        return "\n".join(lines) + "\n"
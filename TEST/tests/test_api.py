@@ -2,8 +2,13 @@ import allure
 import pytest
 from typing import Optional
 
+from support.client import ClientConfig
+from support.schema import assert_valid_created_note, assert_valid_note, assert_valid_notes
+from support.streaming import iter_response_array, validate_stream
+
 # Константы для повторного использования
-TIMEOUT = 10
+# Таймаут запросов (HTTP_TIMEOUT); переданный явно, он важнее таймаутов сессии по эндпоинтам
+TIMEOUT = ClientConfig.from_env().timeout
 
 # Вспомогательные функции для уменьшения дублирования кода
 def check_status_code(response, expected_code: int):
@@ -29,11 +34,10 @@ def safe_get_json(response):
         return None
 
 def check_note_structure(note_data):
-    """Проверка структуры заметки"""
+    """Проверка структуры заметки, созданной тестами, по модели данных (support/schema.py)"""
     if note_data is None:
         return  # Пропускаем проверку если нет данных
-    assert isinstance(note_data, dict), "Данные заметки должны быть словарем"
-    assert "id" in note_data, "Заметка должна содержать поле 'id'"
+    assert_valid_created_note(note_data)
 
 
 @allure.feature("Управление заметками")
@@ -70,6 +74,7 @@ class TestNoteCreation:
             assert "id" in response_data, "Ответ должен содержать ID созданной заметки"
             assert response_data["title"] == note_payload["title"]
             assert response_data["content"] == note_payload["content"]
+            check_note_structure(response_data)
         
         # ИСПРАВЛЕНИЕ: Убрано return response_data["id"] - тесты не должны возвращать значения
 
@@ -145,22 +150,15 @@ class TestNoteCreation:
 class TestNoteRetrieval:
     """Тесты получения заметок"""
     
-    # Динамическое получение ID через создание заметки
+    # Тесты только читают заметку, поэтому берём общую заметку из пула без своего POST
     @pytest.fixture
-    def existing_note_id(self, http, base_url):
-        """Создает заметку и возвращает её ID для использования в тестах"""
-        payload = {
-            "title": "Тестовая заметка для получения",
-            "content": "Содержимое тестовой заметки"
-        }
-        response = http.post(f"{base_url}/note", json=payload, timeout=TIMEOUT)
-        if response.status_code == 201:
-            return safe_get_json(response)["id"]
-        else:
-            pytest.skip("Не удалось создать заметку для теста")
+    def existing_note_id(self, note_pool):
+        """Возвращает ID общей заметки пула"""
+        return note_pool.shared().id
 
     @allure.title("Успешное получение всех заметок")
-    def test_get_all_notes(self, http, base_url):
+    def test_get_all_notes(self, http, base_url, existing_note_id):
+        # existing_note_id гарантирует непустое хранилище даже на отдельном воркере
         with allure.step("Отправка GET запроса для получения всех заметок"):
             response = http.get(f"{base_url}/notes", timeout=TIMEOUT)
         
@@ -171,8 +169,19 @@ class TestNoteRetrieval:
             notes_data = safe_get_json(response)
             assert notes_data is not None, "Ответ должен быть в формате JSON"
             assert isinstance(notes_data, list), "Ответ должен быть списком"
-            for note in notes_data:
-                check_note_structure(note)
+            assert_valid_notes(notes_data)
+
+    @allure.title("Потоковая проверка всех заметок")
+    def test_get_all_notes_streaming(self, http, base_url, existing_note_id):
+        with allure.step("Отправка GET запроса с потоковым чтением ответа"):
+            response = http.get(f"{base_url}/notes", stream=True, timeout=TIMEOUT)
+
+        check_status_code(response, 200)
+        check_content_type_json(response)
+
+        with allure.step("Проверка структуры каждой заметки по мере чтения"):
+            count = validate_stream(iter_response_array(response), assert_valid_note)
+        assert count >= 1, "Список заметок не должен быть пустым"
 
     @allure.title("Получение заметки по существующему ID")
     def test_get_note_by_existing_id(self, http, base_url, existing_note_id):
@@ -215,17 +224,9 @@ class TestNoteUpdate:
     """Тесты обновления заметок"""
     
     @pytest.fixture
-    def existing_note_id(self, http, base_url):
-        """Создает заметку и возвращает её ID для обновления"""
-        payload = {
-            "title": "Исходная заметка для обновления",
-            "content": "Исходное содержимое"
-        }
-        response = http.post(f"{base_url}/note", json=payload, timeout=TIMEOUT)
-        if response.status_code == 201:
-            return safe_get_json(response)["id"]
-        else:
-            pytest.skip("Не удалось создать заметку для теста")
+    def existing_note_id(self, note_pool):
+        """Возвращает ID эксклюзивной заметки пула: тест её меняет"""
+        return note_pool.exclusive().id
 
     @allure.title("Успешное обновление заметки по ID")
     def test_update_note_success(self, http, base_url, existing_note_id):
@@ -279,25 +280,10 @@ class TestNoteUpdate:
 class TestNoteSearch:
     """Тесты поиска заметок"""
     
-    @pytest.fixture
-    def create_note_with_title(self, http, base_url):
-        """Фикстура для создания заметки с определенным заголовком"""
-        def _create_note(title):
-            payload = {
-                "title": title,
-                "content": "Содержимое для поиска"
-            }
-            response = http.post(f"{base_url}/note", json=payload, timeout=TIMEOUT)
-            if response.status_code == 201:
-                return safe_get_json(response)["id"]
-            else:
-                pytest.skip(f"Не удалось создать заметку с заголовком: {title}")
-        return _create_note
-
     @allure.title("Поиск заметки по существующему заголовку")
-    def test_search_note_by_existing_title(self, http, base_url, create_note_with_title):
-        search_title = "Уникальный заголовок для поиска"
-        create_note_with_title(search_title)
+    def test_search_note_by_existing_title(self, http, base_url, note_pool):
+        # Заголовки заметок пула уникальны для воркера и прогона
+        search_title = note_pool.shared().title
         
         with allure.step(f"Поиск заметки по заголовку: {search_title}"):
             response = http.get(
@@ -332,18 +318,9 @@ class TestNoteDeletion:
     """Тесты удаления заметок"""
     
     @pytest.fixture
-    def create_note_for_deletion(self, http, base_url):
-        """Создает заметку специально для тестов удаления"""
-        payload = {
-            "title": "Заметка для удаления",
-            "content": "Эта заметка будет удалена"
-        }
-        response = http.post(f"{base_url}/note", json=payload, timeout=TIMEOUT)
-        if response.status_code == 201:
-            note_data = safe_get_json(response)
-            return note_data["id"]
-        else:
-            pytest.skip("Не удалось создать заметку для удаления")
+    def create_note_for_deletion(self, note_pool):
+        """Возвращает ID эксклюзивной заметки пула специально для тестов удаления"""
+        return note_pool.exclusive().id
 
     @allure.title("Успешное удаление заметки по ID")
     def test_delete_note_success(self, http, base_url, create_note_for_deletion):
@@ -0,0 +1,93 @@
+import os
+
+import allure
+import pytest
+import pytest_asyncio
+
+from test_api import TIMEOUT, check_status_code, safe_get_json
+
+# Количество одновременных запросов в каждом сценарии
+BURST = int(os.getenv("ASYNC_BURST", "100"))
+
+
+@allure.feature("Управление заметками")
+@allure.story("Конкурентный доступ")
+@pytest.mark.asyncio
+class TestConcurrentAccess:
+    """Тесты поведения API при одновременных запросах"""
+
+    @pytest_asyncio.fixture
+    async def shared_note_id(self, async_http, base_url, unique_title):
+        """Создает заметку, за которую конкурируют запросы теста"""
+        payload = {
+            "title": unique_title("Общая заметка"),
+            "content": "Содержимое общей заметки"
+        }
+        response = await async_http.post(f"{base_url}/note", json=payload, timeout=TIMEOUT)
+        if response.status_code == 201:
+            return safe_get_json(response)["id"]
+        else:
+            pytest.skip("Не удалось создать заметку для теста")
+
+    @allure.title("Одновременное создание заметок выдает уникальные ID")
+    async def test_concurrent_create_unique_ids(self, async_http, base_url, unique_title):
+        with allure.step(f"Отправка {BURST} одновременных POST запросов"):
+            responses = await async_http.gather(*(
+                async_http.post(
+                    f"{base_url}/note",
+                    json={"title": unique_title("Конкурентная заметка"), "content": f"№{i}"},
+                    timeout=TIMEOUT
+                )
+                for i in range(BURST)
+            ))
+
+        with allure.step("Проверка статусов и уникальности ID"):
+            for response in responses:
+                check_status_code(response, 201)
+            ids = [safe_get_json(response)["id"] for response in responses]
+            assert len(set(ids)) == len(ids), "ID созданных заметок должны быть уникальными"
+
+    @allure.title("Одновременное чтение одной заметки")
+    async def test_concurrent_read(self, async_http, base_url, shared_note_id):
+        with allure.step(f"Отправка {BURST} одновременных GET запросов"):
+            responses = await async_http.gather(*(
+                async_http.get(f"{base_url}/note/{shared_note_id}", timeout=TIMEOUT)
+                for _ in range(BURST)
+            ))
+
+        for response in responses:
+            check_status_code(response, 200)
+            assert safe_get_json(response)["id"] == shared_note_id
+
+    @allure.title("Одновременное обновление одной заметки")
+    async def test_concurrent_update(self, async_http, base_url, shared_note_id, unique_title):
+        payloads = [{"title": unique_title(f"Версия {i}"), "content": f"Содержимое {i}"} for i in range(BURST)]
+
+        with allure.step(f"Отправка {BURST} одновременных PUT запросов"):
+            responses = await async_http.gather(*(
+                async_http.put(f"{base_url}/note/{shared_note_id}", json=payload, timeout=TIMEOUT)
+                for payload in payloads
+            ))
+
+        for response in responses:
+            assert response.status_code in [200, 204], \
+                f"Ожидался статус 200 или 204, но получен {response.status_code}"
+
+        with allure.step("Проверка что итоговое состояние совпадает с одним из обновлений"):
+            note = safe_get_json(await async_http.get(f"{base_url}/note/{shared_note_id}", timeout=TIMEOUT))
+            assert {"title": note["title"], "content": note["content"]} in payloads
+
+    @allure.title("Одновременное удаление одной заметки")
+    async def test_concurrent_delete(self, async_http, base_url, shared_note_id):
+        with allure.step(f"Отправка {BURST} одновременных DELETE запросов"):
+            responses = await async_http.gather(*(
+                async_http.delete(f"{base_url}/note/{shared_note_id}", timeout=TIMEOUT)
+                for _ in range(BURST)
+            ))
+
+        statuses = [response.status_code for response in responses]
+        assert statuses.count(204) == 1, "Заметка должна удаляться ровно один раз"
+        assert statuses.count(409) == len(statuses) - 1
+
+        get_response = await async_http.get(f"{base_url}/note/{shared_note_id}", timeout=TIMEOUT)
+        check_status_code(get_response, 404)
@@ -0,0 +1,45 @@
+import allure
+
+from support.attachments import format_response
+
+LIMIT = 1024
+
+
+@allure.feature("Вложения")
+@allure.story("Ограничение размера тела")
+class TestResponseAttachment:
+    """Вложение не должно загружать в память всё тело большого ответа"""
+
+    @allure.title("GET /notes: вложение читает только префикс тела")
+    def test_large_body_not_read(self, http, base_url, bulk_seeder, monkeypatch):
+        bulk_seeder(200)
+        monkeypatch.setattr(http, "eager_body_bytes", LIMIT)  # тело GET /notes заведомо длиннее
+        response = http.get(f"{base_url}/notes")
+        assert response.status_code == 200
+        length = int(response.headers["Content-Length"])
+        assert length > 8 * LIMIT, f"Тело слишком короткое для проверки: {length} байт"
+
+        text = format_response(response, LIMIT)
+
+        assert text.endswith(f"[truncated to {LIMIT} bytes]"), text[-200:]
+        assert response._content is False, "Тело загружено в память целиком"
+        assert response.raw.tell() <= LIMIT + 1, f"Из сети прочитано {response.raw.tell()} из {length} байт"
+
+    @allure.title("GET /notes: крупное тело читается по требованию теста")
+    def test_large_body_read_on_demand(self, http, base_url, bulk_seeder, monkeypatch):
+        bulk_seeder(200)
+        monkeypatch.setattr(http, "eager_body_bytes", LIMIT)
+        response = http.get(f"{base_url}/notes")
+        assert response._content is False, "Тело прочитано до обращения теста"
+        notes = response.json()
+        assert len(notes) >= 200
+        assert response.total_elapsed >= response.elapsed.total_seconds()
+
+    @allure.title("GET /notes с stream=False: крупное тело читается сразу")
+    def test_large_body_read_eagerly(self, http, base_url, bulk_seeder, monkeypatch):
+        bulk_seeder(200)
+        monkeypatch.setattr(http, "eager_body_bytes", LIMIT)
+        response = http.get(f"{base_url}/notes", stream=False)
+        assert int(response.headers["Content-Length"]) > LIMIT
+        assert isinstance(response._content, bytes), "Тело не прочитано вместе с запросом"
+        assert response.total_elapsed >= response.elapsed.total_seconds()
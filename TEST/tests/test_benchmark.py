@@ -0,0 +1,47 @@
+import os
+import json
+import pathlib
+
+import allure
+import pytest
+
+from support.bench import BenchConfig, compare_reports, run_benchmark
+
+# Нагрузочный прогон запускается только по запросу: BENCHMARK=1 python -m pytest -m benchmark
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.getenv("BENCHMARK"), reason="Нагрузочный прогон включается через BENCHMARK=1"),
+]
+
+
+@allure.feature("Производительность")
+@allure.story("Нагрузочный прогон")
+class TestBenchmark:
+    """Пропускная способность и задержки эндпоинтов под нагрузкой"""
+
+    @allure.title("Нагрузочный прогон по сценариям функциональных тестов")
+    @pytest.mark.asyncio
+    async def test_workload(self, async_http, base_url, unique_title):
+        config = BenchConfig.from_env()
+
+        with allure.step(f"Нагрузка: {config.mode}, {config.duration} с"):
+            report = await run_benchmark(async_http, base_url, config, unique_title)
+
+        with allure.step("Сохранение отчёта"):
+            output = pathlib.Path(os.getenv("BENCH_OUTPUT", "bench-results.json"))
+            output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            allure.attach(
+                json.dumps(report, ensure_ascii=False, indent=2),
+                name="benchmark.json",
+                attachment_type=allure.attachment_type.JSON
+            )
+
+        assert report["endpoints"]["total"]["count"] > 0, "Не выполнено ни одного запроса"
+
+        baseline_path = os.getenv("BENCH_BASELINE")
+        if baseline_path:
+            with allure.step(f"Сравнение с базовым отчётом {baseline_path}"):
+                baseline = json.loads(pathlib.Path(baseline_path).read_text(encoding="utf-8"))
+                tolerance = float(os.getenv("BENCH_TOLERANCE", "0.2"))
+                regressions = compare_reports(baseline, report, tolerance)
+                assert not regressions, "Регрессия задержек:\n" + "\n".join(regressions)
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import allure
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_incremental(tmp_path, *args) -> subprocess.CompletedProcess:
+    """Отдельный прогон pytest с INCREMENTAL=1, своим кешем и каталогом результатов Allure"""
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith(("PYTEST_", "INCREMENTAL"))}
+    env.update(INCREMENTAL="1", API_BACKEND="inprocess")
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:randomly", "-o", f"cache_dir={tmp_path / 'cache'}",
+         f"--alluredir={tmp_path / 'allure-results'}", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+@allure.feature("Инкрементальный режим")
+@allure.story("Код завершения")
+class TestIncrementalExitCode:
+    """Прогон, в котором все тесты взяты из кеша, должен считаться успешным"""
+
+    @allure.title("Повторный прогон без изменений завершается с кодом 0")
+    def test_all_cached_run_succeeds(self, tmp_path):
+        first = run_incremental(tmp_path, "tests/test_streaming.py")
+        assert first.returncode == pytest.ExitCode.OK, first.stdout[-2000:]
+
+        second = run_incremental(tmp_path, "tests/test_streaming.py")
+        assert "deselected" in second.stdout, second.stdout[-2000:]
+        assert second.returncode == pytest.ExitCode.OK, second.stdout[-2000:]
@@ -0,0 +1,30 @@
+import allure
+import pytest
+
+from support.inprocess import InProcessAdapter
+
+URL = "http://inprocess/note"
+
+
+@allure.feature("Встроенный бэкенд")
+@allure.story("Кодировка тела запроса")
+class TestBodyCharset:
+    """Тело, которое нельзя декодировать, - 400, как у body-parser, а не исключение в тесте"""
+
+    @allure.title("POST /note: {case}")
+    @pytest.mark.parametrize("content_type, body, case", [
+        ("application/json", b'{"title": "\\xff\\xfe", "content": \xff}', "невалидный UTF-8"),
+        ("application/json; charset=latin1", b'{"title": "a", "content": "b"}', "неподдерживаемая кодировка"),
+        ("application/json; charset=utf-99", b'{"title": "a", "content": "b"}', "неизвестная кодировка"),
+    ], ids=["invalid_utf8", "latin1", "unknown_utf"])
+    def test_undecodable_body(self, content_type, body, case):
+        status, headers, _ = InProcessAdapter().handle("POST", URL, {"Content-Type": content_type}, body)
+        assert status == 400
+        assert headers["Content-Type"].startswith("text/html")
+
+    @allure.title("POST /note: тело в UTF-16 с charset=utf-16")
+    def test_utf16_body(self):
+        body = '{"title": "Заметка", "content": "Текст"}'.encode("utf-16")
+        status, _, _ = InProcessAdapter().handle(
+            "POST", URL, {"Content-Type": "application/json; charset=utf-16"}, body)
+        assert status == 201
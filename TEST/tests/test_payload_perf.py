@@ -0,0 +1,134 @@
+import os
+import json
+import pathlib
+import statistics
+
+import allure
+import pytest
+
+from test_api import safe_get_json
+from support.metrics import percentile
+from support.payload import ALPHABETS, find_limit, linear_breakpoint, make_body
+
+# Развёртка размеров тела строится только по запросу: PAYLOAD_PERF=1 python -m pytest -m payload_perf
+pytestmark = [
+    pytest.mark.payload_perf,
+    pytest.mark.skipif(not os.getenv("PAYLOAD_PERF"), reason="Развёртка размеров тела включается через PAYLOAD_PERF=1"),
+]
+
+# От байтов до мегабайтов, с точками вокруг лимита body-parser (100 КиБ)
+DEFAULT_SIZES = "64,256,1024,4096,16384,65536,98304,102400,106496,262144,1048576,4194304"
+SIZES = sorted(int(size) for size in os.getenv("PAYLOAD_PERF_SIZES", DEFAULT_SIZES).split(","))
+REPEAT = int(os.getenv("PAYLOAD_PERF_REPEAT", "5"))
+PAYLOAD_TIMEOUT = float(os.getenv("PAYLOAD_PERF_TIMEOUT", "60"))
+LINEAR_TOLERANCE = float(os.getenv("PAYLOAD_PERF_LINEAR_TOLERANCE", "0.5"))
+NOISE_MS = float(os.getenv("PAYLOAD_PERF_NOISE_MS", "1"))
+
+EXPECTED_STATUS = {"POST": 201, "PUT": 204}
+HEADERS = {"Content-Type": "application/json; charset=utf-8"}
+
+
+@pytest.fixture(scope="module")
+def payload_curve():
+    """Точки и лимиты; после модуля сохраняются в PAYLOAD_PERF_OUTPUT и прикрепляются к Allure"""
+    curve = {"points": [], "limits": {}}
+    yield curve
+    if curve["points"] or curve["limits"]:
+        series = {}
+        for point in curve["points"]:
+            series.setdefault(f"{point['method']} {point['alphabet']}", []).append(point)
+        report = json.dumps({
+            "endpoints": ["POST /note", "PUT /note/:id"],
+            "repeat": REPEAT,
+            "limits": curve["limits"],
+            "linearity": {name: linear_breakpoint(points, LINEAR_TOLERANCE, NOISE_MS)
+                          for name, points in sorted(series.items())},
+            "points": curve["points"],
+        }, ensure_ascii=False, indent=2)
+        pathlib.Path(os.getenv("PAYLOAD_PERF_OUTPUT", "payload-results.json")).write_text(report, encoding="utf-8")
+        allure.attach(report, name="payload_sweep.json", attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture
+def send_payload(http, base_url, note_pool):
+    """Отправляет тело методом POST (созданная заметка сразу удаляется) или PUT в эксклюзивную заметку"""
+    target = {}
+
+    def _send(method: str, body: bytes):
+        if method == "POST":
+            response = http.post(f"{base_url}/note", data=body, headers=HEADERS, timeout=PAYLOAD_TIMEOUT)
+            note = safe_get_json(response) if response.status_code == 201 else None
+            if note:
+                http.delete(f"{base_url}/note/{note['id']}", timeout=PAYLOAD_TIMEOUT)
+            return response
+        if "note" not in target:
+            target["note"] = note_pool.exclusive()
+        return http.put(f"{base_url}/note/{target['note'].id}", data=body, headers=HEADERS, timeout=PAYLOAD_TIMEOUT)
+
+    yield _send
+    if "note" in target:
+        http.delete(f"{base_url}/note/{target['note'].id}", timeout=PAYLOAD_TIMEOUT)
+
+
+@allure.feature("Производительность")
+@allure.story("Размер тела запроса")
+@pytest.mark.latency_budget(PAYLOAD_TIMEOUT * 1000)
+class TestPayloadSize:
+    """Задержка и приём POST/PUT /note в зависимости от размера и алфавита тела"""
+
+    @allure.title("{method} /note: развёртка размеров тела ({alphabet})")
+    @pytest.mark.parametrize("alphabet", list(ALPHABETS))
+    @pytest.mark.parametrize("method", list(EXPECTED_STATUS))
+    def test_payload_sweep(self, send_payload, unique_title, payload_curve, method, alphabet):
+        points = []
+        for size in SIZES:
+            body = make_body(size, alphabet, unique_title("Размер тела"))
+            with allure.step(f"{method}: {len(body)} байт ({alphabet})"):
+                latencies, statuses, response_bytes = [], set(), 0
+                for _ in range(REPEAT):
+                    response = send_payload(method, body)
+                    latencies.append(response.total_elapsed)
+                    statuses.add(response.status_code)
+                    response_bytes = len(response.content)
+            assert statuses <= {EXPECTED_STATUS[method], 413}, f"Неожиданные статусы для {len(body)} байт: {statuses}"
+            assert len(statuses) == 1, f"Сервер то принимает, то отклоняет тело {len(body)} байт: {statuses}"
+            status = statuses.pop()
+            ordered = sorted(latencies)
+            points.append({
+                "method": method,
+                "alphabet": alphabet,
+                "size": size,
+                "request_bytes": len(body),
+                "response_bytes": response_bytes,
+                "status": status,
+                "accepted": status != 413,
+                "median_ms": round(statistics.median(ordered) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+                "throughput_mb_s": round(len(body) / statistics.median(ordered) / 2 ** 20, 3),
+            })
+
+        # Граница одна: после первого отклонённого размера больше ничего не принимается
+        accepted = [point["accepted"] for point in points]
+        assert accepted == sorted(accepted, reverse=True), \
+            f"Приём тела не монотонен по размеру: {[(p['request_bytes'], p['status']) for p in points]}"
+        payload_curve["points"].extend(points)
+
+    @allure.title("{method} /note: точный лимит размера тела")
+    @pytest.mark.parametrize("method", list(EXPECTED_STATUS))
+    def test_body_limit(self, send_payload, unique_title, payload_curve, method):
+        title = unique_title("Лимит тела")
+
+        def accepted(size: int) -> bool:
+            status = send_payload(method, make_body(size, "ascii", title)).status_code
+            assert status in (EXPECTED_STATUS[method], 413), f"Неожиданный статус {status} для {size} байт"
+            return status != 413
+
+        low, high = len(make_body(0, "ascii", title)), SIZES[-1]
+        assert accepted(low), "Сервер не принял минимальное тело"
+        if accepted(high):
+            payload_curve["limits"][method] = None  # лимита нет в пределах развёртки
+            pytest.skip(f"{method} принимает тело в {high} байт - лимит выше развёртки")
+        with allure.step(f"Бинарный поиск лимита между {low} и {high} байт"):
+            limit = find_limit(accepted, low, high)
+        payload_curve["limits"][method] = limit
+        allure.attach(str(limit), name="body_limit_bytes.txt", attachment_type=allure.attachment_type.TEXT)
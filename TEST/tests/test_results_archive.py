@@ -0,0 +1,46 @@
+import json
+import time
+import zipfile
+
+import allure
+
+from support.results_archive import RUNS_PREFIX, RetentionPolicy, list_runs, prune
+
+POLICY = RetentionPolicy(keep_runs=5, max_age_days=0, prune_slack=3)
+
+
+def make_archive(path, count: int):
+    """Архив из count прогонов по одному результату в каждом"""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index in range(count):
+            run_id = f"run{index:03d}"
+            meta = {"run_id": run_id, "worker": "master", "started": time.time() - count + index}
+            archive.writestr(f"{RUNS_PREFIX}{run_id}/run-master.json", json.dumps(meta))
+            archive.writestr(f"{RUNS_PREFIX}{run_id}/{index}-result.json", "{}")
+    return path
+
+
+@allure.feature("Архив результатов")
+@allure.story("Политика хранения")
+class TestPrune:
+    """Архив переписывается не на каждом прогоне, а когда накопилось больше prune_slack лишних"""
+
+    @allure.title("Небольшой излишек прогонов не переписывает архив")
+    def test_surplus_within_slack(self, tmp_path):
+        path = make_archive(tmp_path / "results.zip", POLICY.keep_runs + POLICY.prune_slack)
+        modified = path.stat().st_mtime_ns
+        assert prune(path, POLICY) == []
+        assert path.stat().st_mtime_ns == modified
+        assert len(list_runs(path)) == POLICY.keep_runs + POLICY.prune_slack
+
+    @allure.title("Излишек больше prune_slack удаляет старые прогоны")
+    def test_surplus_over_slack(self, tmp_path):
+        path = make_archive(tmp_path / "results.zip", POLICY.keep_runs + POLICY.prune_slack + 1)
+        assert len(prune(path, POLICY)) == POLICY.prune_slack + 1
+        assert [run["run_id"] for run in list_runs(path)] == [f"run{index:03d}" for index in range(4, 9)]
+
+    @allure.title("force удаляет лишние прогоны сразу")
+    def test_force(self, tmp_path):
+        path = make_archive(tmp_path / "results.zip", POLICY.keep_runs + 1)
+        assert prune(path, POLICY, force=True) == ["run000"]
+        assert len(list_runs(path)) == POLICY.keep_runs
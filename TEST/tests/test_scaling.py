@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import pathlib
+import warnings
+
+import allure
+import pytest
+
+from test_api import check_status_code
+
+# Кривая масштабирования строится только по запросу: SCALING=1 python -m pytest -m scaling
+pytestmark = [
+    pytest.mark.scaling,
+    pytest.mark.skipif(not os.getenv("SCALING"), reason="Тесты масштабирования включаются через SCALING=1"),
+]
+
+SIZES = [int(size) for size in os.getenv("SCALING_SIZES", "10000,100000,1000000").split(",")]
+SCALING_TIMEOUT = float(os.getenv("SCALING_TIMEOUT", "120"))
+
+
+@pytest.fixture(scope="module")
+def scaling_curve():
+    """Точки кривой; после модуля сохраняются в SCALING_OUTPUT и прикрепляются к Allure"""
+    points = []
+    yield points
+    if points:
+        report = json.dumps({"endpoint": "GET /notes", "points": points}, ensure_ascii=False, indent=2)
+        pathlib.Path(os.getenv("SCALING_OUTPUT", "scaling-results.json")).write_text(report, encoding="utf-8")
+        allure.attach(report, name="notes_scaling.json", attachment_type=allure.attachment_type.JSON)
+
+
+@allure.feature("Производительность")
+@allure.story("Масштабирование списка заметок")
+class TestNotesListScaling:
+    """Как растут задержка, размер ответа и время разбора GET /notes с числом заметок"""
+
+    @allure.title("GET /notes при {size} заметках")
+    @pytest.mark.latency_budget(SCALING_TIMEOUT * 1000, "GET /notes")
+    @pytest.mark.parametrize("size", sorted(SIZES), ids=[f"{size}_notes" for size in sorted(SIZES)])
+    def test_list_scaling(self, http, base_url, bulk_seeder, scaling_curve, size):
+        with allure.step(f"Наполнение API до {size} заметок"):
+            seed_started = time.perf_counter()
+            total = bulk_seeder(size)
+            seed_seconds = time.perf_counter() - seed_started
+
+        with allure.step("Отправка GET запроса для получения всех заметок"):
+            # stream=False: тело читается сразу и входит в latency_ms, а не в parse_ms
+            response = http.get(f"{base_url}/notes", timeout=SCALING_TIMEOUT, stream=False)
+        check_status_code(response, 200)
+        assert isinstance(response._content, bytes), "Тело не прочитано до разбора: parse_ms включил бы передачу"
+
+        with allure.step("Разбор ответа на клиенте"):
+            parse_started = time.perf_counter()
+            notes = json.loads(response.content)
+            parse_seconds = time.perf_counter() - parse_started
+        assert isinstance(notes, list), "Ответ должен быть списком"
+        assert len(notes) >= size, f"Ожидалось не меньше {size} заметок, получено {len(notes)}"
+
+        point = {
+            "size": size,
+            "notes_returned": len(notes),
+            "store_size": total,
+            "latency_ms": round(response.total_elapsed * 1000, 3),  # включая передачу тела
+            "payload_bytes": len(response.content),
+            "parse_ms": round(parse_seconds * 1000, 3),
+            "seed_s": round(seed_seconds, 3),
+        }
+        if scaling_curve:
+            previous = scaling_curve[-1]
+            if len(notes) > previous["notes_returned"]:
+                # Отношение роста задержки к росту N: ~1 - линейно, >1 - хуже линейного
+                growth = len(notes) / previous["notes_returned"]
+                point["latency_growth_vs_n"] = round(point["latency_ms"] / previous["latency_ms"] / growth, 3)
+            else:
+                # В хранилище уже было больше заметок, чем этот размер: точка не добавляет N
+                point["n_not_grown"] = True
+                warnings.warn(f"GET /notes при размере {size} вернул {len(notes)} заметок - "
+                              f"не больше, чем предыдущая точка; рост задержки не считается")
+        scaling_curve.append(point)
+        allure.attach(
+            json.dumps(point, ensure_ascii=False, indent=2),
+            name="scaling_point.json",
+            attachment_type=allure.attachment_type.JSON
+        )
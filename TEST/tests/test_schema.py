@@ -0,0 +1,30 @@
+import allure
+import pytest
+
+from support.schema import validate_note
+
+NOTE = {
+    "id": 1,
+    "title": "Заметка",
+    "content": "Текст",
+    "created": "2024-01-02T00:00:00.000Z",
+    "changed": "2024-01-01T00:00:00.000Z",
+}
+
+
+@allure.feature("Схема заметки")
+@allure.story("Порядок дат")
+class TestNoteDates:
+    """changed раньше created - нарушение, даже если в заметке есть другие ошибки"""
+
+    @allure.title("Порядок дат проверяется при ошибках других полей")
+    @pytest.mark.parametrize("broken", [{}, {"id": -1}, {"title": 5, "extra": True}],
+                             ids=["no_other_errors", "bad_id", "bad_title_and_extra"])
+    def test_order_reported_with_other_errors(self, broken):
+        violations = validate_note(dict(NOTE, **broken))
+        assert ("changed", "раньше, чем created") in [(v.path, v.message) for v in violations], violations
+
+    @allure.title("Порядок не проверяется, если дата некорректна")
+    def test_order_skipped_for_invalid_date(self):
+        violations = validate_note(dict(NOTE, changed="вчера"))
+        assert [(v.path, v.message) for v in violations] == [("changed", "не дата ISO-8601")]
@@ -0,0 +1,153 @@
+import os
+import json
+import math
+import pathlib
+import statistics
+from urllib.parse import quote
+
+import allure
+import pytest
+
+from test_api import check_status_code, safe_get_json
+from support.metrics import percentile
+from support.schema import TITLE_MAX_LENGTH
+
+# Набор проверок поиска по заголовку строится только по запросу: SEARCH_PERF=1 python -m pytest -m search_perf
+pytestmark = [
+    pytest.mark.search_perf,
+    pytest.mark.skipif(not os.getenv("SEARCH_PERF"), reason="Замеры поиска включаются через SEARCH_PERF=1"),
+]
+
+SIZES = sorted(int(size) for size in os.getenv("SEARCH_PERF_SIZES", "1000,10000,100000").split(","))
+REPEAT = int(os.getenv("SEARCH_PERF_REPEAT", "20"))
+DUPLICATES = 50
+
+# Заголовки проб: длина до 500 символов (как в test_create_note_long_title), Unicode, эмодзи
+# и символы, которые в пути нужно кодировать
+PROBES = {
+    "short": "П",
+    "length_100": "Д" * 100,
+    "length_500": "X" * 500,
+    "unicode": "Заметка с ёлкой и ünïcödé",
+    "emoji": "Тест с эмодзи 😀🎉",
+    "special_chars": "50% скидка? #1 & a/b + c=d",
+}
+
+
+def lookup(http, base_url, title: str) -> tuple:
+    """Повторяет поиск REPEAT раз; возвращает (последний ответ, задержки в секундах)"""
+    latencies = []
+    response = None
+    for _ in range(REPEAT):
+        response = http.get(f"{base_url}/note/read/{quote(title, safe='')}")
+        latencies.append(response.total_elapsed)
+    return response, latencies
+
+
+def create_note(http, base_url, title: str) -> int:
+    response = http.post(f"{base_url}/note", json={"title": title, "content": "Проба поиска"})
+    check_status_code(response, 201)
+    return safe_get_json(response)["id"]
+
+
+def growth_exponent(points: list) -> dict:
+    """Показатель k в scan_ms ~ N^k между меньшим и большим размером хранилища.
+
+    scan_ms - задержка сверх поиска заметки из начала хранилища, то есть без
+    постоянных расходов на запрос. k около 1 - линейный просмотр, около 0 -
+    поиск не зависит от размера (индекс).
+    """
+    by_case = {}
+    for point in points:
+        by_case.setdefault(point["case"], []).append(point)
+    result = {}
+    for case, case_points in sorted(by_case.items()):
+        first, last = min(case_points, key=lambda p: p["store_size"]), max(case_points, key=lambda p: p["store_size"])
+        if last["store_size"] <= first["store_size"] or first["scan_ms"] <= 0 or last["scan_ms"] <= 0:
+            continue
+        result[case] = round(
+            math.log(last["scan_ms"] / first["scan_ms"]) / math.log(last["store_size"] / first["store_size"]), 3
+        )
+    return result
+
+
+@pytest.fixture(scope="module")
+def search_curve():
+    """Точки замеров; после модуля сохраняются в SEARCH_PERF_OUTPUT и прикрепляются к Allure"""
+    points = []
+    yield points
+    if points:
+        report = json.dumps({
+            "endpoint": "GET /note/read/:title",
+            "repeat": REPEAT,
+            "growth_exponent": growth_exponent(points),
+            "points": points,
+        }, ensure_ascii=False, indent=2)
+        pathlib.Path(os.getenv("SEARCH_PERF_OUTPUT", "search-results.json")).write_text(report, encoding="utf-8")
+        allure.attach(report, name="title_search.json", attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="module")
+def head_notes(http, base_url, unique_title):
+    """Заметки в начале хранилища (до наполнения): одна проба и серия дубликатов заголовка"""
+    head_title = unique_title("Первая заметка поиска")
+    duplicate_title = unique_title("Повторяющийся заголовок")
+    head_id = create_note(http, base_url, head_title)
+    duplicate_ids = [create_note(http, base_url, duplicate_title) for _ in range(DUPLICATES)]
+    return {"head": (head_title, head_id), "duplicates": (duplicate_title, min(duplicate_ids))}
+
+
+@allure.feature("Производительность")
+@allure.story("Поиск заметки по заголовку")
+class TestTitleSearchPerformance:
+    """Задержка GET /note/read/:title в зависимости от размера хранилища, позиции и вида заголовка"""
+
+    @allure.title("Поиск по заголовку при {size} заметках")
+    @pytest.mark.parametrize("size", SIZES, ids=[f"{size}_notes" for size in SIZES])
+    def test_title_lookup(self, http, base_url, bulk_seeder, head_notes, search_curve, unique_title, size):
+        with allure.step(f"Наполнение API до {size} заметок"):
+            store_size = bulk_seeder(size)
+
+        # Пробы в конце хранилища: последовательный поиск проходит всё хранилище
+        with allure.step("Создание проб в конце хранилища"):
+            cases = {}
+            for case, base in PROBES.items():
+                # Уникальный суффикс не даёт совпасть с пробами прошлых размеров; длина не больше 500
+                title = (base + unique_title(""))[-TITLE_MAX_LENGTH:]
+                cases[case] = (title, create_note(http, base_url, title))
+        store_size += len(cases)
+
+        measurements = {
+            **{case: (title, note_id, "tail") for case, (title, note_id) in cases.items()},
+            "head": (*head_notes["head"], "head"),
+            "duplicates": (*head_notes["duplicates"], "head"),
+            "missing": (unique_title("ТАКОГО ТАЙТЛА ТОЧНО НЕТ"), None, "missing"),
+        }
+        points = []
+        for case, (title, note_id, position) in measurements.items():
+            with allure.step(f"Поиск: {case} ({len(title)} символов, позиция {position})"):
+                response, latencies = lookup(http, base_url, title)
+            if note_id is None:
+                check_status_code(response, 404)
+            else:
+                check_status_code(response, 200)
+                note = safe_get_json(response)
+                assert note["title"] == title, f"Найдена заметка с другим заголовком: {note['title']!r}"
+                # Для дубликатов сервер возвращает первую подходящую заметку
+                assert note["id"] == note_id, f"Ожидалась заметка {note_id}, получена {note['id']}"
+            ordered = sorted(latencies)
+            points.append({
+                "size": size,
+                "store_size": store_size,
+                "case": case,
+                "position": position,
+                "title_length": len(title),
+                "median_ms": round(statistics.median(ordered) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            })
+
+        # Заметка из начала хранилища находится сразу - её задержка и есть постоянные расходы запроса
+        overhead = next(point["median_ms"] for point in points if point["case"] == "head")
+        for point in points:
+            point["scan_ms"] = round(point["median_ms"] - overhead, 3)
+        search_curve.extend(points)
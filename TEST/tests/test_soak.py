@@ -0,0 +1,46 @@
+import os
+import json
+import pathlib
+
+import allure
+import pytest
+
+from support.soak import SoakConfig, render_chart, run_soak
+
+# Длительный прогон запускается только по запросу: SOAK=1 python -m pytest -m soak
+pytestmark = [
+    pytest.mark.soak,
+    pytest.mark.skipif(not os.getenv("SOAK"), reason="Soak-прогон включается через SOAK=1"),
+]
+
+
+@allure.feature("Производительность")
+@allure.story("Длительный прогон")
+class TestSoak:
+    """Дрейф задержек и памяти при постоянной нагрузке в течение часов"""
+
+    @allure.title("Soak-прогон по сценариям функциональных тестов")
+    @pytest.mark.asyncio
+    async def test_soak(self, async_http, base_url, notes_store, unique_title):
+        config = SoakConfig.from_env()
+        # In-process заглушка работает в процессе pytest - меряем его RSS
+        rss_pid = os.getpid() if notes_store is not None else config.server_pid
+        output = pathlib.Path(os.getenv("SOAK_OUTPUT", "soak-results.jsonl"))
+
+        with allure.step(f"Нагрузка {config.rate} запросов/с в течение {config.duration} с"):
+            report = await run_soak(async_http, base_url, config, unique_title, rss_pid=rss_pid, output=output)
+
+        with allure.step("Сохранение отчёта и графика"):
+            allure.attach(
+                json.dumps(report, ensure_ascii=False, indent=2),
+                name="soak.json",
+                attachment_type=allure.attachment_type.JSON
+            )
+            allure.attach(render_chart(report["points"]), name="soak_trend.svg",
+                          attachment_type=allure.attachment_type.SVG)
+
+        assert report["points"], "Не записано ни одной точки"
+        assert not report["drift"], "Рост метрик за прогон:\n" + "\n".join(
+            f"{trend['metric']}: {trend['start']} -> {trend['end']} (+{trend['growth']:.0%})"
+            for trend in report["trends"] if trend["drift"]
+        )
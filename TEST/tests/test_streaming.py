@@ -0,0 +1,30 @@
+import json
+
+import allure
+import pytest
+
+from support.streaming import iter_json_array
+
+
+def byte_chunks(data: bytes, size: int = 1):
+    """Режет тело на куски по size байт, как это может сделать сеть"""
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@allure.feature("Потоковый разбор")
+@allure.story("Разбор JSON-массива по кускам")
+class TestIterJsonArray:
+    """Элементы не должны зависеть от того, где проходят границы кусков"""
+
+    @allure.title("Числа на границе кусков по 1 байту")
+    @pytest.mark.parametrize("payload", [
+        [{"id": 12345, "t": "x"}, 678, 9.5e3],
+        [77966.5, -0.25, 1e-2, 10, True, None, "Заметка 😀"],
+    ], ids=["numbers_after_object", "mixed_values"])
+    def test_one_byte_chunks(self, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        assert list(iter_json_array(byte_chunks(data))) == payload
+
+    @allure.title("Число целиком в конце куска")
+    def test_number_at_chunk_end(self):
+        assert list(iter_json_array([b"[77966", b".", b"5e", b"1]"])) == [779665.0]
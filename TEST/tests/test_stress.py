@@ -0,0 +1,41 @@
+import os
+import json
+import pathlib
+
+import allure
+import pytest
+
+from support.stress import StressConfig, make_session, run_stress
+
+# Стресс-прогон запускается только по запросу: STRESS=1 python -m pytest -m stress
+pytestmark = [
+    pytest.mark.stress,
+    pytest.mark.skipif(not os.getenv("STRESS"), reason="Стресс-прогон включается через STRESS=1"),
+]
+
+
+@allure.feature("Производительность")
+@allure.story("Конкурентные изменения")
+class TestStress:
+    """Согласованность данных при гонках PUT, DELETE и POST"""
+
+    @allure.title("Стресс-прогон создания, обновления, удаления и чтения")
+    def test_mutating_endpoints_consistency(self, base_url, notes_store, unique_title, note_pool):
+        config = StressConfig.from_env()
+
+        with allure.step(f"Стресс-прогон: {config.workers} потоков, {config.duration} с"):
+            report, note_ids = run_stress(base_url, config, unique_title, lambda: make_session(notes_store))
+            note_pool.track(note_ids)  # оставшиеся заметки удаляются в конце сессии
+
+        with allure.step("Сохранение отчёта"):
+            text = json.dumps(report, ensure_ascii=False, indent=2)
+            output = os.getenv("STRESS_OUTPUT")
+            if output:
+                pathlib.Path(output).write_text(text, encoding="utf-8")
+            allure.attach(text, name="stress.json", attachment_type=allure.attachment_type.JSON)
+
+        assert report["operations"] > 0, "Не выполнено ни одного запроса"
+        assert not report["anomaly_counts"], "Нарушена согласованность данных:\n" + "\n".join(
+            f"{kind}: {count}\n  " + "\n  ".join(report["anomalies"][kind][:5])
+            for kind, count in report["anomaly_counts"].items()
+        )